@@ -0,0 +1,98 @@
+"""
+AVI to image sequence export of the GUI's AVI panel, the part that runs in worker processes.
+
+It only imports OpenCV and the svo_io writers, so the processes started by svo_images.export_avi_images()
+do not load Tk, PIL or the ZED SDK before they can start reading.
+"""
+
+import os
+import time
+
+import cv2
+
+from svo_io import ImageWriterPool
+from svo_profile import StageProfiler, NULL_PROFILER
+
+MAX_GRAB_GAP = 30             # larger gaps between exported frames are seeked over instead of grabbed through
+PROGRESS_INTERVAL = 0.2       # seconds between progress reports of the AVI worker processes
+
+
+def frame_name(fn):
+    return f'frame_{str(fn).zfill(6)}.png'
+
+
+def export_avi_part(in_file, image_folder, frame_numbers, side, scale, stop, on_frame, profiler, writers):
+    # Export `frame_numbers` (ascending) with one VideoCapture; on_frame(i) is called after frame i
+    cap = cv2.VideoCapture(in_file)
+    if not cap.isOpened():
+        raise IOError('Could not open AVI file.')
+
+    errors = 0
+    expected = None
+    image_writer = ImageWriterPool(writers, profiler=profiler)
+    try:
+        for i, fn in enumerate(frame_numbers):
+            if stop is not None and stop.is_set():
+                break
+
+            # Read on from the previous frame; the video is only repositioned for the first frame, over
+            # large gaps and after a read error
+            if expected is not None and 0 <= fn - expected <= MAX_GRAB_GAP:
+                with profiler.time('skip'):
+                    while expected < fn and cap.grab():
+                        expected += 1
+            if expected != fn:
+                with profiler.time('seek'):
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, fn)
+            with profiler.time('read'):
+                ret, frame = cap.read()
+            expected = fn + 1 if ret else None
+            if not ret:
+                errors += 1
+                if errors > 10:
+                    raise IOError(f'Too many read errors, aborting at frame {fn}.')
+                continue
+
+            w = frame.shape[1]
+            if side == 'left': frame = frame[:, :w // 2]
+            elif side == 'right': frame = frame[:, w // 2:]
+            if scale != 1:
+                # The AVI decoder only gives full frames, so scale after cropping to the exported side
+                with profiler.time('resize'):
+                    frame = cv2.resize(frame, (max(2, round(frame.shape[1] * scale)), max(2, round(frame.shape[0] * scale))),
+                                       interpolation=cv2.INTER_AREA)
+
+            # Frames stay BGR: cv2.imwrite writes them as RGB PNG files
+            image_writer.submit(os.path.join(image_folder, frame_name(fn)), frame)
+            profiler.frame()
+            if on_frame: on_frame(i)
+    finally:
+        cap.release()
+        image_writer.close()
+    failures = image_writer.pop_failures()
+    if failures:
+        path, err = failures[0]
+        raise IOError(f'{len(failures)} image(s) could not be written, e.g. {path}: {err}')
+    return image_writer.written
+
+
+def avi_part_worker(k, in_file, image_folder, frame_numbers, side, scale, cancel, events, profile, writers):
+    # Entry point of the worker processes of svo_images.export_avi_images()
+    profiler = StageProfiler() if profile else NULL_PROFILER
+    last = [0.0]
+    def on_frame(i):
+        now = time.time()
+        if now - last[0] >= PROGRESS_INTERVAL or i == len(frame_numbers) - 1:
+            last[0] = now
+            events.put((k, 'progress', i + 1))
+    written = 0
+    try:
+        written = export_avi_part(in_file, image_folder, frame_numbers, side, scale, cancel, on_frame, profiler,
+                                  writers)
+    except Exception as e:
+        events.put((k, 'error', str(e)))
+    finally:
+        if profile:
+            events.put((k, 'stages', profiler.stages))
+        events.put((k, 'done', written))
+
@@ -0,0 +1,589 @@
+"""
+Benchmarks for the SVO export helpers.
+
+Runs on CPU only and without the ZED SDK: frames come from a deterministic stand-in source
+instead of a pyzed camera.
+
+    python svo_bench.py compose --width 2208 --height 1242 --frames 300
+    python svo_bench.py depth --width 1280 --height 720 --frames 200
+    python svo_bench.py encode --width 1280 --height 720 --frames 150
+    python svo_bench.py export --width 1280 --height 720 --frames 300
+    python svo_bench.py seek --frames 300 --gop 30 --decode_ms 2
+    python svo_bench.py avi_images --width 1280 --height 720 --frames 600 --processes 4
+    python svo_bench.py preview --width 2208 --height 1242 --label 960x540
+
+The export benchmark runs the real export code end to end (every svo_export.py mode and the GUI's
+image sequence exports in svo_images.py) on a synthetic recording opened through svo_fake.py.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import cv2
+
+from svo_io import rgba_to_rgb, compose_sbs_rgb, open_video_writer, OPENCV_FOURCCS
+from svo_depth import DepthArchiveWriter, DepthArchive
+from svo_profile import peak_rss_bytes
+import svo_fake
+
+
+class StandInFrames:
+    """Deterministic synthetic RGBA frames with the layout returned by sl.Mat.get_data()."""
+    def __init__(self, width, height, variants=4):
+        yy, xx = np.mgrid[0:height, 0:width]
+        self.width = width
+        self.height = height
+        self.frames = []
+        for k in range(variants):
+            img = np.empty((height, width, 4), dtype=np.uint8)
+            img[..., 0] = (xx + 7 * k) % 256
+            img[..., 1] = (yy + 13 * k) % 256
+            img[..., 2] = (xx + yy + 29 * k) % 256
+            img[..., 3] = 255
+            self.frames.append(img)
+        # What the SDK hands back for sl.VIEW.SIDE_BY_SIDE
+        self.sbs = [np.concatenate([self.frames[k], self.frames[(k + 1) % variants]], axis=1)
+                    for k in range(variants)]
+
+    def left(self, n):
+        return self.frames[n % len(self.frames)]
+
+    def right(self, n):
+        return self.frames[(n + 1) % len(self.frames)]
+
+    def side_by_side(self, n):
+        return self.sbs[n % len(self.sbs)]
+
+    def textured_sbs(self, count):
+        # BGR side-by-side frames with camera-like noise and motion, so encoders are not flattered
+        rng = np.random.default_rng(0)
+        noise = rng.integers(0, 24, (self.height, self.width * 2 + count * 4, 3), dtype=np.uint8)
+        frames = []
+        for n in range(count):
+            frame = cv2.cvtColor(np.concatenate([self.left(n), self.right(n)], axis=1), cv2.COLOR_RGBA2RGB)
+            frames.append(cv2.add(frame, noise[:, n * 4:n * 4 + self.width * 2]))
+        return frames
+
+    def depth(self, n):
+        # Smooth float32 depth in millimetres, like sl.MEASURE.DEPTH with UNIT.MILLIMETER
+        yy, xx = np.mgrid[0:self.height, 0:self.width].astype(np.float32)
+        return 800.0 + 4.0 * yy + 2.0 * xx + 50.0 * np.sin((xx + n) / 37.0) * np.cos(yy / 23.0)
+
+
+def _compose_legacy(src, sbs_rgba):
+    # Previous svo_export path: copy both halves into an RGBA buffer, then allocate the RGB frame
+    width = src.width
+    def compose(n):
+        sbs_rgba[:, :width, :] = src.left(n)
+        sbs_rgba[:, width:, :] = src.right(n)
+        return cv2.cvtColor(sbs_rgba, cv2.COLOR_RGBA2RGB)
+    return compose
+
+
+def _count_large_allocations(compose, frames, min_bytes=1 << 20):
+    # Number of blocks of at least `min_bytes` that each compose call leaves allocated
+    tracemalloc.start()
+    try:
+        counts = []
+        for n in range(frames):
+            before = tracemalloc.take_snapshot()
+            result = compose(n)
+            after = tracemalloc.take_snapshot()
+            diff = after.compare_to(before, 'traceback')
+            counts.append(sum(stat.count_diff for stat in diff if stat.size_diff >= min_bytes))
+            del result
+        return sum(counts) / frames
+    finally:
+        tracemalloc.stop()
+
+
+def _time_frames(compose, frames):
+    compose(0)
+    t0 = time.perf_counter()
+    for n in range(frames):
+        compose(n)
+    return frames / (time.perf_counter() - t0)
+
+
+def bench_compose(opt):
+    src = StandInFrames(opt.width, opt.height)
+    sbs_rgba = np.zeros((opt.height, opt.width * 2, 4), dtype=np.uint8)
+    dst = np.empty((opt.height, opt.width * 2, 3), dtype=np.uint8)
+
+    paths = [
+        ('legacy copy + cvtColor', _compose_legacy(src, sbs_rgba)),
+        ('SIDE_BY_SIDE -> preallocated', lambda n: rgba_to_rgb(src.side_by_side(n), dst)),
+        ('left/right -> preallocated', lambda n: compose_sbs_rgb(src.left(n), src.right(n), dst)),
+    ]
+
+    reference = paths[0][1](1).copy()
+    print(f"SBS composition, {opt.width * 2}x{opt.height}, {opt.frames} frames")
+    print(f"{'path':32s} {'fps':>9s} {'large allocs/frame':>19s}")
+    for name, compose in paths:
+        assert np.array_equal(compose(1), reference), name
+        fps = _time_frames(compose, opt.frames)
+        allocs = _count_large_allocations(compose, min(opt.frames, 20))
+        print(f"{name:32s} {fps:9.1f} {allocs:19.2f}")
+
+
+def _folder_mb(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+
+
+def bench_depth(opt):
+    src = StandInFrames(opt.width, opt.height, variants=1)
+    depths = [src.depth(n) for n in range(8)]
+    frame_mb = opt.width * opt.height * 2 / 1e6
+    read_count = min(opt.frames, 100)
+    read_start = random.Random(0).randrange(0, opt.frames - read_count + 1)
+
+    print(f"Depth export, {opt.width}x{opt.height} uint16, {opt.frames} frames, "
+          f"reading frames {read_start}-{read_start + read_count - 1}")
+    print(f"{'format':20s} {'write fps':>10s} {'MB/s':>8s} {'disk MB':>8s} {'files':>6s} {'range read fps':>15s}")
+
+    tmp = tempfile.mkdtemp(prefix='svo_bench_')
+    try:
+        png_dir = os.path.join(tmp, 'png')
+        os.mkdir(png_dir)
+        t0 = time.perf_counter()
+        for n in range(opt.frames):
+            cv2.imwrite(os.path.join(png_dir, "depth%s.png" % str(n).zfill(6)), depths[n % 8].astype(np.uint16))
+        write_fps = opt.frames / (time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        block = np.stack([cv2.imread(os.path.join(png_dir, "depth%s.png" % str(n).zfill(6)), cv2.IMREAD_UNCHANGED)
+                          for n in range(read_start, read_start + read_count)])
+        read_fps = read_count / (time.perf_counter() - t0)
+        print(f"{'png':20s} {write_fps:10.1f} {write_fps * frame_mb:8.1f} {_folder_mb(png_dir):8.1f} "
+              f"{len(os.listdir(png_dir)):6d} {read_fps:15.1f}")
+
+        npy_dir = os.path.join(tmp, 'npy')
+        os.mkdir(npy_dir)
+        t0 = time.perf_counter()
+        archive = DepthArchiveWriter(npy_dir, opt.width, opt.height, opt.chunk_frames, opt.frames)
+        for n in range(opt.frames):
+            archive.append(n, depths[n % 8])
+        archive.close()
+        write_fps = opt.frames / (time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        sliced = np.array(DepthArchive(npy_dir)[read_start:read_start + read_count])
+        read_fps = read_count / (time.perf_counter() - t0)
+        assert np.array_equal(block, sliced)
+        print(f"{'npy chunks':20s} {write_fps:10.1f} {write_fps * frame_mb:8.1f} {_folder_mb(npy_dir):8.1f} "
+              f"{len(os.listdir(npy_dir)):6d} {read_fps:15.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def _encoder_configs(opt):
+    configs = [('opencv', fourcc, None, None) for fourcc in OPENCV_FOURCCS]
+    if shutil.which('ffmpeg'):
+        for preset in ('ultrafast', 'veryfast', 'medium'):
+            configs.append(('ffmpeg', 'libx264', preset, opt.crf))
+        configs.append(('ffmpeg', 'ffv1', None, None))
+    else:
+        print("ffmpeg not found on PATH, skipping the ffmpeg backend")
+    return configs
+
+
+def bench_encode(opt):
+    src = StandInFrames(opt.width, opt.height)
+    frames = src.textured_sbs(min(opt.frames, 60))
+    size = (opt.width * 2, opt.height)
+    raw_mb = opt.frames * size[0] * size[1] * 3 / 1e6
+    configs = _encoder_configs(opt)
+
+    print(f"Video encode, {size[0]}x{size[1]} BGR, {opt.frames} frames ({raw_mb:.0f} MB raw)")
+    print(f"{'backend':8s} {'codec':8s} {'preset':10s} {'fps':>8s} {'MB':>8s} {'ratio':>7s}")
+    tmp = tempfile.mkdtemp(prefix='svo_bench_')
+    try:
+        for encoder, codec, preset, crf in configs:
+            path = os.path.join(tmp, f'{encoder}_{codec}_{preset}.avi')
+            writer = open_video_writer(path, 30, size, encoder, codec, preset or 'medium', crf or 23)
+            if not writer.isOpened():
+                print(f"{encoder:8s} {codec:8s} {'-':10s} {'not available':>17s}")
+                continue
+            t0 = time.perf_counter()
+            for n in range(opt.frames):
+                writer.write(frames[n % len(frames)])
+            writer.release()
+            fps = opt.frames / (time.perf_counter() - t0)
+            mb = os.path.getsize(path) / 1e6
+            print(f"{encoder:8s} {codec:8s} {preset or '-':10s} {fps:8.1f} {mb:8.1f} {raw_mb / max(mb, 1e-6):7.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+class _MemorySampler:
+    """Peak resident memory while a block runs, sampled from /proc/self/statm.
+
+    Where /proc is not available, the peak RSS of the whole process is reported instead.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+
+    def _rss(self):
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+    def _sample(self):
+        while not self.done.wait(self.interval):
+            self.peak = max(self.peak, self._rss())
+
+    def __enter__(self):
+        try:
+            self.peak = self._rss()
+        except (OSError, ValueError, AttributeError):
+            self.thread = None
+            return self
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.thread is None:
+            self.peak = peak_rss_bytes() or 0
+            return
+        self.done.set()
+        self.thread.join()
+        self.peak = max(self.peak, self._rss())
+
+
+def _output_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def bench_export(opt):
+    # Import the export code only now, so that `import pyzed.sl` finds the fake camera
+    svo_fake.install()
+    import svo_export
+    import svo_images
+
+    tmp = tempfile.mkdtemp(prefix='svo_bench_')
+    svo = os.path.join(tmp, 'bench.svo2')
+    svo_fake.write_synthetic_svo(svo, opt.width, opt.height, opt.frames)
+    frames = opt.frames
+
+    runs = [
+        ('mode 0 AVI left+right', dict(mode=0, output_avi_file=os.path.join(tmp, 'm0.avi')), 'm0.avi'),
+        ('mode 1 AVI left+depth', dict(mode=1, output_avi_file=os.path.join(tmp, 'm1.avi')), 'm1.avi'),
+        ('mode 2 PNG left+right', dict(mode=2, output_path_dir=os.path.join(tmp, 'm2')), 'm2'),
+        ('mode 3 PNG left+depth', dict(mode=3, output_path_dir=os.path.join(tmp, 'm3')), 'm3'),
+        ('mode 4 PNG depth16', dict(mode=4, output_path_dir=os.path.join(tmp, 'm4')), 'm4'),
+        ('mode 4 npy depth16', dict(mode=4, output_path_dir=os.path.join(tmp, 'm4npy'), depth_format='npy'), 'm4npy'),
+    ]
+    expected_files = {'m2': 2 * frames, 'm3': 2 * frames, 'm4': 2 * frames}
+
+    print(f"Export of a synthetic {opt.width}x{opt.height} recording, {opt.frames} frames "
+          f"(fake camera, {os.cpu_count()} CPUs)")
+    print(f"{'export':28s} {'frames':>7s} {'fps':>8s} {'MB/s':>8s} {'out MB':>8s} {'peak MiB':>9s}  check")
+    failed = False
+
+    def report(name, done, seconds, output, peak, problem):
+        nonlocal failed
+        mb = _output_bytes(output) / 1e6
+        failed = failed or bool(problem)
+        print(f"{name:28s} {done:7d} {done / seconds:8.1f} {mb / seconds:8.1f} {mb:8.1f} {peak / 2**20:9.0f}  "
+              f"{problem or 'ok'}")
+
+    try:
+        for name, options, output in runs:
+            output = os.path.join(tmp, output)
+            if 'output_path_dir' in options:
+                os.mkdir(output)
+            events = []
+            opt_run = svo_export.make_options(input_svo_file=svo, **options)
+            with _MemorySampler() as mem:
+                t0 = time.perf_counter()
+                status = svo_export.convert(opt_run, on_event=events.append)
+                seconds = time.perf_counter() - t0
+            done = next((e['frames_done'] for e in events if e['event'] == 'done'), 0)
+            problem = None
+            if status != 0 or done != frames:
+                problem = f"FAILED: status {status}, {done}/{frames} frames"
+            elif output.endswith('.avi'):
+                cap = cv2.VideoCapture(output)
+                count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                cap.release()
+                if count != frames:
+                    problem = f"FAILED: AVI holds {count}/{frames} frames"
+            elif os.path.basename(output) in expected_files:
+                count = len(os.listdir(output))
+                if count != expected_files[os.path.basename(output)]:
+                    problem = f"FAILED: {count} files, expected {expected_files[os.path.basename(output)]}"
+            report(name, done, seconds, output, mem.peak, problem)
+
+        # The GUI's image sequence exports: every frame of the SVO, and every frame of the mode 0 AVI
+        gui_runs = [('GUI SVO -> PNG (left)', svo_images.export_svo_images, svo, range(opt.frames)),
+                    ('GUI AVI -> PNG (left)', svo_images.export_avi_images, os.path.join(tmp, 'm0.avi'), range(frames))]
+        for name, export, source, frame_numbers in gui_runs:
+            output = os.path.join(tmp, name.split()[1].lower() + '_png')
+            os.mkdir(output)
+            with _MemorySampler() as mem:
+                t0 = time.perf_counter()
+                try:
+                    done = export(source, output, frame_numbers, 'left')
+                    problem = None
+                except IOError as e:
+                    done, problem = 0, f"FAILED: {e}"
+                seconds = time.perf_counter() - t0
+            if problem is None and (done != len(frame_numbers) or len(os.listdir(output)) != done):
+                problem = f"FAILED: {len(os.listdir(output))} files, expected {len(frame_numbers)}"
+            report(name, done, seconds, output, mem.peak, problem)
+    finally:
+        shutil.rmtree(tmp)
+    if failed:
+        raise SystemExit(1)
+
+
+def _svo_images_legacy(svo_images, in_file, image_folder, frame_numbers, side):
+    # Previous GUI image export: reposition the SVO before every grab, even for consecutive frames
+    zed = svo_images._open_svo(in_file)
+    retriever = svo_images._SideRetriever(zed, side, 1.0, svo_images.NULL_PROFILER)
+    written = 0
+    for fn in frame_numbers:
+        zed.set_svo_position(fn)
+        if zed.grab() == svo_images.sl.ERROR_CODE.SUCCESS:
+            svo_images.Image.fromarray(retriever.rgb()).save(os.path.join(image_folder, svo_images._frame_name(fn)))
+            written += 1
+    zed.close()
+    return written
+
+
+def bench_seek(opt):
+    svo_fake.install()
+    import svo_images
+
+    tmp = tempfile.mkdtemp(prefix='svo_bench_')
+    svo = os.path.join(tmp, 'bench.svo2')
+    svo_fake.write_synthetic_svo(svo, opt.width, opt.height, opt.frames, gop=opt.gop, decode_ms=opt.decode_ms)
+    print(f"SVO image export, {opt.width}x{opt.height}, {opt.frames} frames, keyframe every {opt.gop} frames, "
+          f"{opt.decode_ms} ms per decoded frame")
+    print(f"{'frames':10s} {'path':18s} {'fps':>8s} {'decoded/frame':>14s}  output")
+    paths = [('seek every frame', lambda folder, frames: _svo_images_legacy(svo_images, svo, folder, frames, 'left')),
+             ('sequential grab', lambda folder, frames: svo_images.export_svo_images(svo, folder, frames, 'left'))]
+    # Gaps up to MAX_GRAB_GAP are grabbed through, the last stride is seeked over
+    strides = sorted({1, opt.stride, 2 * svo_images.MAX_GRAB_GAP})
+    failed = False
+    try:
+        for stride in strides:
+            frame_numbers = range(0, opt.frames, stride)
+            reference = None
+            for name, export in paths:
+                folder = os.path.join(tmp, f'{stride}_{name.replace(" ", "_")}')
+                os.mkdir(folder)
+                decoded = svo_fake.Camera.total_decoded_frames
+                t0 = time.perf_counter()
+                written = export(folder, frame_numbers)
+                fps = written / (time.perf_counter() - t0)
+                decoded = svo_fake.Camera.total_decoded_frames - decoded
+                if reference is None:
+                    reference, same = folder, 'reference'
+                else:
+                    same = 'identical' if _same_files(reference, folder) else 'DIFFERENT'
+                    failed = failed or same != 'identical'
+                print(f"{f'stride {stride}':10s} {name:18s} {fps:8.1f} {decoded / max(written, 1):14.2f}  {same}")
+    finally:
+        shutil.rmtree(tmp)
+    if failed:
+        raise SystemExit(1)
+
+
+def _avi_images_legacy(in_file, image_folder, frame_numbers, side):
+    # Previous GUI AVI image export: seek before every frame, convert to RGB and save with PIL
+    from PIL import Image
+    cap = cv2.VideoCapture(in_file)
+    written = 0
+    for fn in frame_numbers:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, fn)
+        ret, frame = cap.read()
+        if not ret:
+            continue
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        w = frame.shape[1]
+        if side == 'left': frame = frame[:, :w // 2]
+        elif side == 'right': frame = frame[:, w // 2:]
+        Image.fromarray(frame).save(os.path.join(image_folder, f'frame_{str(fn).zfill(6)}.png'))
+        written += 1
+    cap.release()
+    return written
+
+
+def bench_avi_images(opt):
+    svo_fake.install()
+    import svo_export
+    import svo_images
+
+    tmp = tempfile.mkdtemp(prefix='svo_bench_')
+    svo = os.path.join(tmp, 'bench.svo2')
+    avi = os.path.join(tmp, 'bench.avi')
+    svo_fake.write_synthetic_svo(svo, opt.width, opt.height, opt.frames)
+    if svo_export.convert(svo_export.make_options(mode=0, input_svo_file=svo, output_avi_file=avi),
+                          on_event=lambda event: None) != 0:
+        raise SystemExit("Could not write the test AVI")
+    print(f"AVI image export, {opt.width * 2}x{opt.height} {svo_export.DEFAULT_CODECS['opencv']} AVI, "
+          f"{opt.frames} frames, left side")
+    print(f"{'frames':10s} {'path':28s} {'fps':>8s} {'speed-up':>9s}  output")
+    paths = [('seek every frame (previous)', lambda folder, frames: _avi_images_legacy(avi, folder, frames, 'left')),
+             ('sequential, 1 process', lambda folder, frames: svo_images.export_avi_images(avi, folder, frames, 'left')),
+             (f'sequential, {opt.processes} processes',
+              lambda folder, frames: svo_images.export_avi_images(avi, folder, frames, 'left', processes=opt.processes))]
+    failed = False
+    try:
+        for stride in (1, opt.stride):
+            frame_numbers = range(0, opt.frames, stride)
+            reference = reference_fps = None
+            for k, (name, export) in enumerate(paths):
+                folder = os.path.join(tmp, f'{stride}_{k}')
+                os.mkdir(folder)
+                t0 = time.perf_counter()
+                written = export(folder, frame_numbers)
+                fps = written / (time.perf_counter() - t0)
+                if reference is None:
+                    reference, reference_fps, same = folder, fps, 'reference'
+                else:
+                    same = 'identical pixels' if _same_pixels(reference, folder) else 'DIFFERENT'
+                    failed = failed or same == 'DIFFERENT'
+                print(f"{f'stride {stride}':10s} {name:28s} {fps:8.1f} {fps / reference_fps:8.1f}x  {same}")
+    finally:
+        shutil.rmtree(tmp)
+    if failed:
+        raise SystemExit(1)
+
+
+def bench_preview(opt):
+    from PIL import Image
+    from svo_preview import resize_for_preview
+
+    src = StandInFrames(opt.width, opt.height)
+    frames = [cv2.cvtColor(src.side_by_side(n), cv2.COLOR_BGRA2RGB) for n in range(4)]
+    label_w, label_h = (int(v) for v in opt.label.split('x'))
+    print(f"Preview rendering, {opt.width * 2}x{opt.height} side-by-side frames into a {label_w}x{label_h} label")
+    print(f"{'path':36s} {'ms/frame':>9s}")
+
+    def ms_per_frame(render, images):
+        render(images[0])
+        t0 = time.perf_counter()
+        for n in range(opt.frames):
+            render(images[n % len(images)])
+        return (time.perf_counter() - t0) / opt.frames * 1000
+
+    for name, render in (('resize: PIL LANCZOS thumbnail', lambda rgb: resize_for_preview(rgb, label_w, label_h)),
+                         ('resize: cv2 INTER_AREA', lambda rgb: resize_for_preview(rgb, label_w, label_h, fast=True))):
+        print(f"{name:36s} {ms_per_frame(render, frames):9.2f}")
+
+    # The PhotoImage half needs a display
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"{'PhotoImage':36s} skipped ({e})")
+        return
+    try:
+        small = [resize_for_preview(rgb, label_w, label_h, fast=True) for rgb in frames]
+        label = tk.Label(root)
+        photo = ImageTk.PhotoImage(Image.fromarray(small[0]))
+        label.config(image=photo)
+        def new_photo(rgb):
+            label.image = ImageTk.PhotoImage(Image.fromarray(rgb))
+            label.config(image=label.image)
+            root.update_idletasks()
+        def paste(rgb):
+            photo.paste(Image.fromarray(rgb))
+            root.update_idletasks()
+        print(f"{'PhotoImage: new per frame (previous)':36s} {ms_per_frame(new_photo, small):9.2f}")
+        print(f"{'PhotoImage: paste into one':36s} {ms_per_frame(paste, small):9.2f}")
+    finally:
+        root.destroy()
+
+
+def _same_pixels(a, b):
+    names = sorted(os.listdir(a))
+    if names != sorted(os.listdir(b)):
+        return False
+    return all(np.array_equal(cv2.imread(os.path.join(a, name)), cv2.imread(os.path.join(b, name))) for name in names)
+
+
+def _same_files(a, b):
+    names = sorted(os.listdir(a))
+    if names != sorted(os.listdir(b)):
+        return False
+    for name in names:
+        with open(os.path.join(a, name), 'rb') as fa, open(os.path.join(b, name), 'rb') as fb:
+            if fa.read() != fb.read():
+                return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter)
+    sub = parser.add_subparsers(dest='bench', required=True)
+
+    p = sub.add_parser('compose', help='Side-by-side RGBA -> RGB frame composition of the AVI export')
+    p.add_argument('--width', type=int, default=2208, help='Width of a single (left or right) frame')
+    p.add_argument('--height', type=int, default=1242, help='Height of a frame')
+    p.add_argument('--frames', type=int, default=200, help='Number of frames to compose')
+    p.set_defaults(func=bench_compose)
+
+    p = sub.add_parser('depth', help='Mode 4 depth output: 16-bit PNG per frame against the .npy chunk archive')
+    p.add_argument('--width', type=int, default=1280, help='Width of a depth frame')
+    p.add_argument('--height', type=int, default=720, help='Height of a depth frame')
+    p.add_argument('--frames', type=int, default=200, help='Number of frames to write')
+    p.add_argument('--chunk_frames', type=int, default=1000, help='Frames per .npy chunk')
+    p.set_defaults(func=bench_depth)
+
+    p = sub.add_parser('encode', help='Encode fps and output size of every available video backend and codec')
+    p.add_argument('--width', type=int, default=1280, help='Width of a single (left or right) frame')
+    p.add_argument('--height', type=int, default=720, help='Height of a frame')
+    p.add_argument('--frames', type=int, default=150, help='Number of frames to encode')
+    p.add_argument('--crf', type=int, default=23, help='CRF used for the ffmpeg x264 runs')
+    p.set_defaults(func=bench_encode)
+
+    p = sub.add_parser('export', help='Every svo_export.py mode and the GUI image exports on a synthetic recording\n'
+                                      '(through the fake camera of svo_fake.py): fps, MB/s and peak memory')
+    p.add_argument('--width', type=int, default=1280, help='Width of a single (left or right) frame')
+    p.add_argument('--height', type=int, default=720, help='Height of a frame')
+    p.add_argument('--frames', type=int, default=300, help='Number of frames in the synthetic recording')
+    p.set_defaults(func=bench_export)
+
+    p = sub.add_parser('seek', help='GUI SVO image export: seeking before every frame against sequential grabs,\n'
+                                    'on a synthetic recording with keyframes (svo_fake.py)')
+    p.add_argument('--width', type=int, default=1280, help='Width of a single (left or right) frame')
+    p.add_argument('--height', type=int, default=720, help='Height of a frame')
+    p.add_argument('--frames', type=int, default=300, help='Number of frames in the synthetic recording')
+    p.add_argument('--gop', type=int, default=30, help='Frames per group of pictures (keyframe interval)')
+    p.add_argument('--decode_ms', type=float, default=2.0, help='Simulated decoding time per decoded frame')
+    p.add_argument('--stride', type=int, default=3, help='Stride of the second comparison (a third one, twice\n'
+                                                         'MAX_GRAB_GAP, seeks over the skipped frames)')
+    p.set_defaults(func=bench_seek)
+
+    p = sub.add_parser('avi_images', help='GUI AVI image export: the previous seek-per-frame loop against sequential\n'
+                                          'reading in one and in several processes')
+    p.add_argument('--width', type=int, default=1280, help='Width of a single (left or right) frame')
+    p.add_argument('--height', type=int, default=720, help='Height of a frame')
+    p.add_argument('--frames', type=int, default=600, help='Number of frames in the test AVI')
+    p.add_argument('--stride', type=int, default=3, help='Stride of the second comparison')
+    p.add_argument('--processes', type=int, default=max(2, os.cpu_count() or 1), help='Processes of the parallel run')
+    p.set_defaults(func=bench_avi_images)
+
+    p = sub.add_parser('preview', help='GUI preview rendering: LANCZOS against area resizing, new PhotoImage per frame\n'
+                                       'against paste into one (the PhotoImage part needs a display)')
+    p.add_argument('--width', type=int, default=2208, help='Width of a single (left or right) frame')
+    p.add_argument('--height', type=int, default=1242, help='Height of a frame')
+    p.add_argument('--frames', type=int, default=60, help='Number of frames to render per path')
+    p.add_argument('--label', default='960x540', help='Size of the preview label, WIDTHxHEIGHT')
+    p.set_defaults(func=bench_preview)
+
+    opt = parser.parse_args()
+    opt.func(opt)
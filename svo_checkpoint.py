@@ -0,0 +1,68 @@
+"""
+Checkpoints that let an interrupted svo_export.py run (--resume) continue where it stopped.
+
+A checkpoint is a small JSON file saved next to the output while the export runs:
+
+    <output>.avi.checkpoint.json                    AVI modes
+    <output folder>/svo_export_checkpoint.json      image sequence modes
+
+It holds the export parameters, the first frame that still has to be exported and, for AVI exports,
+the segment files that are already complete. A checkpoint is only used again by an export with the
+same parameters and the same (unchanged) input file.
+"""
+
+import json
+import os
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+IMAGE_CHECKPOINT = 'svo_export_checkpoint.json'
+
+
+def input_signature(path):
+    # Identifies an input file well enough to notice that it was replaced or modified
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime': int(st.st_mtime)}
+
+
+class Checkpoint:
+    """Progress of one export: `next_frame` and the completed `segments` (list of dicts with 'file')."""
+    def __init__(self, path, params, next_frame=0):
+        self.path = path
+        self.params = params
+        self.next_frame = next_frame
+        self.frames_done = 0
+        self.segments = []
+        self.stale_segments = []
+
+    def load(self):
+        # Restore the saved progress. Returns False when there is no checkpoint or it was written with
+        # different parameters; the segments of such a checkpoint are listed in stale_segments.
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('params') != json.loads(json.dumps(self.params)):
+            self.stale_segments = data.get('segments', [])
+            return False
+        segments = data.get('segments', [])
+        if not all(os.path.isfile(s['file']) for s in segments):
+            # A completed segment went missing, its frames have to be exported again
+            self.stale_segments = segments
+            return False
+        self.next_frame = data['next_frame']
+        self.frames_done = data.get('frames_done', 0)
+        self.segments = segments
+        return True
+
+    def save(self):
+        data = {'version': 1, 'params': self.params, 'next_frame': self.next_frame,
+                'frames_done': self.frames_done, 'segments': self.segments}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
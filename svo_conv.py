@@ -16,10 +16,9 @@
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, ttk
 import os
-import subprocess
+import shutil
 import threading
 import queue
-import re
 import time
 from PIL import Image, ImageTk
 import datetime
@@ -32,9 +31,17 @@ except ImportError:
     print("Error: OpenCV (cv2) not found. Please install opencv-python.")
     exit()
 
+from svo_manifest import Manifest
+from svo_preview import (FrameCache, PreviewDecoder, Playback, SvoSource, AviSource, ThumbnailIndex, resize_for_preview,
+                         scale_to_fit)
+from svo_ranges import FrameRange, load_ranges, format_ranges, check_range_names, visit_plan, count_seeks
+from svo_profile import StageProfiler, NULL_PROFILER, format_summary
+import svo_images
+
 # ZED SDK
 try:
     import pyzed.sl as sl
+    import svo_export
     ZED_AVAILABLE = True
 except ImportError:
     ZED_AVAILABLE = False
@@ -67,6 +74,14 @@ GRAPH_GREEN_DARK  = "#2E8B57"
 GRAPH_GREEN_LIGHT = "#ADFF2F"
 GRAPH_ERROR       = "#FF3B30"
 
+# Memory budget of the decoded preview frames kept for timeline scrubbing (trim and AVI players together)
+PREVIEW_CACHE_BYTES = 256 * 2**20
+PROGRESS_POLL_MS    = 50    # progress and log lines reach the widgets at most this often
+LOG_MAX_LINES       = 5000  # older lines are dropped from the log panels
+GRAPH_POINTS        = 200   # progress graphs keep one point per 0.5 %
+SCRUB_SETTLE_MS     = 150   # the full frame is decoded once the trim slider rests that long
+CHECKPOINT_FRAMES   = 1000  # frames between the opt-in periodic checkpoints of the conversions
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 #  HELPER FUNCTIONS
@@ -270,58 +285,94 @@ class RoundedEntry(tk.Frame):
 
 
 class ProgressGraph(tk.Canvas):
-    """Animated gradient speed graph with error marking."""
+    """Animated gradient speed graph with error marking.
+
+    The history keeps at most one point per 1/GRAPH_POINTS of the progress (the latest update of each
+    step), and an update only adds or replaces the newest segment. The whole graph is redrawn when the
+    canvas size changes or when a speed goes above the scale.
+    """
     def __init__(self, parent, c1, c2, title="", height=80):
         super().__init__(parent, height=height, bg=BG_COLOR, highlightthickness=1, highlightbackground=BORDER_COLOR)
         self.c1 = c1
         self.c2 = c2
         self.title = title
-        self.history = []  
+        self.history = []       # (pct, speed)
+        self.last_step = -1     # progress step of the newest history point
+        self.last_line = None   # canvas item of the newest segment
         self.errors = []   
         self.max_speed = 0.001
+        self.drawn_size = None
         self.draw_ui()
 
     def draw_ui(self):
         self.delete('all')
         w = self.winfo_width()
         h = self.winfo_height()
+        self.drawn_size = (w, h)
+        self.last_line = None
         if w < 10: return
 
         self.create_rectangle(0, 0, w, h, fill=BG_COLOR, outline=BORDER_COLOR, width=1)
+        for k in range(1, len(self.history)):
+            self.last_line = self._draw_segment(k)
+        for err_pct in self.errors:
+            self._draw_error(err_pct)
 
-        if not self.history: return
-
-        prev_x, prev_y = None, None
-        speeds = [s for p, s in self.history]
-        self.max_speed = max(max(speeds) if speeds else 0.001, self.max_speed)
-        
-        for i in range(len(self.history)):
-            pct, speed = self.history[i]
-            x = (pct / 100.0) * w
-            normalized_h = (speed / self.max_speed) * (h - 20)
-            y = h - normalized_h - 2
+    def redraw_if_resized(self):
+        if (self.winfo_width(), self.winfo_height()) != self.drawn_size:
+            self.draw_ui()
 
-            if prev_x is not None:
-                factor = (prev_x + x) / (2 * w)
-                color = interpolate_color(self.c1, self.c2, factor)
-                self.create_line(prev_x, prev_y, x, y, fill=color, width=4, capstyle='round', smooth=True)
+    def _point(self, k):
+        w, h = self.drawn_size
+        pct, speed = self.history[k]
+        return (pct / 100.0) * w, h - (speed / self.max_speed) * (h - 20) - 2
 
-            prev_x, prev_y = x, y
+    def _draw_segment(self, k):
+        # Line from history point k - 1 to point k
+        x0, y0 = self._point(k - 1)
+        x1, y1 = self._point(k)
+        color = interpolate_color(self.c1, self.c2, (x0 + x1) / (2 * self.drawn_size[0]))
+        return self.create_line(x0, y0, x1, y1, fill=color, width=4, capstyle='round', smooth=True)
 
-        for err_pct in self.errors:
-            err_x = (err_pct / 100.0) * w
-            self.create_line(err_x, 0, err_x, h, fill=GRAPH_ERROR, width=2, dash=(4, 4))
+    def _draw_error(self, pct):
+        w, h = self.drawn_size
+        err_x = (pct / 100.0) * w
+        self.create_line(err_x, 0, err_x, h, fill=GRAPH_ERROR, width=2, dash=(4, 4))
 
     def update_graph(self, pct, speed):
-        self.history.append((pct, speed))
-        self.draw_ui()
+        step = int(pct / 100.0 * GRAPH_POINTS)
+        if self.history and step <= self.last_step:
+            self.history[-1] = (pct, speed)
+        else:
+            self.history.append((pct, speed))
+            self.last_step = step
+            self.last_line = None
+
+        if speed > self.max_speed:
+            # Headroom above the new peak, so that the scale (and a full redraw) rarely changes
+            self.max_speed = speed * 1.25
+            self.draw_ui()
+            return
+        if (self.winfo_width(), self.winfo_height()) != self.drawn_size:
+            self.draw_ui()
+            return
+        if self.drawn_size[0] < 10 or len(self.history) < 2: return
+        if self.last_line is None:
+            self.last_line = self._draw_segment(len(self.history) - 1)
+        else:
+            # The newest point moved within its progress step: move its segment
+            x0, y0 = self._point(len(self.history) - 2)
+            x1, y1 = self._point(len(self.history) - 1)
+            self.coords(self.last_line, x0, y0, x1, y1)
 
     def mark_error(self, pct):
         self.errors.append(pct)
-        self.draw_ui()
+        if self.drawn_size[0] >= 10:
+            self._draw_error(pct)
 
     def clear(self):
         self.history = []
+        self.last_step = -1
         self.errors = []
         self.max_speed = 0.001
         self.draw_ui()
@@ -351,29 +402,65 @@ class SVOConverterApp:
         self.avi_start_frame_var = tk.StringVar(value="0")
         self.avi_end_frame_var   = tk.StringVar(value="0")
 
-        self.log_queue       = queue.Queue()
-        self.progress_queue  = queue.Queue()
-        self.stop_event      = threading.Event()
-        self.running_process = None
+        # Batch worker pool size (simultaneous svo_export worker processes)
+        self.batch_workers_var = tk.StringVar(value=str(max(1, min(4, (os.cpu_count() or 1) // 2))))
+        # Incremental batches: files recorded in the output folder's manifest are skipped unless forced
+        self.batch_force_var       = tk.BooleanVar(value=False)
+        self.batch_fingerprint_var = tk.BooleanVar(value=False)
+        # Opt-in periodic checkpoints: every checkpoint closes an AVI segment that has to be joined at the end
+        self.checkpoint_var        = tk.BooleanVar(value=False)
+
+        self.log_queue         = queue.Queue()
+        # Workers only overwrite the latest progress of their target; process_queues() shows it at its own rate
+        self.progress_lock     = threading.Lock()
+        self.progress_latest   = {}    # target -> (pct, speed, detail)
+        self.progress_errors   = []    # (target, pct)
+        self.stop_event        = threading.Event()
+        self.export_workers    = []    # svo_export.ExportWorker per batch slot, reused across files and batches
+        self.trim_worker       = None
+        self.batch_slots       = []
 
         # SVO Player States
         self.trim_video_capture = None
+        self.trim_video_path    = None
+        self.preview_cache      = FrameCache(PREVIEW_CACHE_BYTES)
+        # Preview frames are decoded off the Tk thread, one decoder per player; the sequence numbers keep a
+        # late decode from replacing a newer frame on screen
+        self.trim_decoder       = PreviewDecoder(self._decode_preview, self._deliver_preview, 'trim-preview')
+        self.avi_decoder        = PreviewDecoder(self._decode_preview, self._deliver_preview, 'avi-preview')
+        self.preview_seq        = 0
+        self.preview_shown      = {}
+        self.trim_playback      = None    # svo_preview.Playback while the player runs
+        self.trim_index         = None    # svo_preview.ThumbnailIndex of the loaded SVO, shown while scrubbing
+        self.trim_index_stop    = threading.Event()
+        self.trim_settle_id     = None
+        self.avi_playback       = None
         self.trim_total_frames  = 0
         self.trim_fps           = 30
         self.trim_start_frame   = 0
         self.trim_end_frame     = 0
+        self.trim_ranges        = []    # svo_ranges.FrameRange list, exported in one pass when not empty
         self.is_playing         = False
         self.svo_export_side    = tk.StringVar(value='left')
+        self.svo_export_stride  = tk.StringVar(value='1')
+        self.svo_export_scale   = tk.StringVar(value='1')
+        # Opt-in stage timing of the trim and AVI panel exports, reported in the panel's log
+        self.profile_var        = tk.BooleanVar(value=False)
         self.svo_preview_side   = tk.StringVar(value='left')
 
         # AVI Player States
         self.avi_video_capture    = None
+        self.avi_video_path       = None
         self.avi_total_frames     = 0
         self.avi_fps              = 30
         self.avi_start_frame      = 0
         self.avi_end_frame        = 0
         self.avi_is_playing       = False
         self.avi_export_side      = tk.StringVar(value='left')
+        self.avi_export_stride    = tk.StringVar(value='1')
+        self.avi_export_scale     = tk.StringVar(value='1')
+        # Worker processes splitting the AVI image export range, each with its own VideoCapture
+        self.avi_export_processes = tk.StringVar(value='1')
         self.avi_preview_side     = tk.StringVar(value='left')
 
         # Layout Setup
@@ -395,12 +482,22 @@ class SVOConverterApp:
         self.show_frame("SVO Trim and Export")
         self.root.after(100, self.process_queues)
         self.root.bind("<Configure>", lambda e: self._redraw_graphs())
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        # Stop the running exports and shut the worker processes down before the window goes away
+        self.stop_event.set()
+        for worker in self.export_workers + [self.trim_worker]:
+            if worker:
+                worker.cancel()
+                worker.close()
+        self.root.destroy()
 
     def _redraw_graphs(self):
-        if hasattr(self, 'batch_single_graph'): self.batch_single_graph.draw_ui()
-        if hasattr(self, 'batch_overall_graph'): self.batch_overall_graph.draw_ui()
-        if hasattr(self, 'trim_overall_graph'): self.trim_overall_graph.draw_ui()
-        if hasattr(self, 'avi_overall_graph'): self.avi_overall_graph.draw_ui()
+        for slot in self.batch_slots: slot['graph'].redraw_if_resized()
+        if hasattr(self, 'batch_overall_graph'): self.batch_overall_graph.redraw_if_resized()
+        if hasattr(self, 'trim_overall_graph'): self.trim_overall_graph.redraw_if_resized()
+        if hasattr(self, 'avi_overall_graph'): self.avi_overall_graph.redraw_if_resized()
 
     # ── Sidebar Navigation ─────────────────────────────────────────────────
     def _create_sidebar(self):
@@ -455,10 +552,23 @@ class SVOConverterApp:
 
         tk.Label(tl, text="Output Directory (.AVI)", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=(0, 5))
         row2 = tk.Frame(tl, bg=BG_COLOR)
-        row2.pack(fill='x', pady=(0, 30))
+        row2.pack(fill='x', pady=(0, 20))
         RoundedEntry(row2, width=400, textvariable=self.batch_output_dir).pack(side='left', padx=(0, 10))
         PillButton(row2, text="Browse", w=90, command=self.select_batch_output).pack(side='left')
 
+        tk.Label(tl, text="Parallel Jobs", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=(0, 5))
+        tk.Spinbox(tl, from_=1, to=max(1, os.cpu_count() or 1), textvariable=self.batch_workers_var, width=5,
+                   bg=ENTRY_BG, fg=TEXT_COLOR, buttonbackground=PANEL_BG, insertbackground=TEXT_COLOR, relief='flat',
+                   font=('Segoe UI', 11), justify='center').pack(anchor='w', pady=(0, 15))
+
+        for text, var in (("Re-convert files already in the output folder", self.batch_force_var),
+                          ("Compare file contents, not only dates", self.batch_fingerprint_var),
+                          (f"Save a checkpoint every {CHECKPOINT_FRAMES} frames (resume after a crash)", self.checkpoint_var)):
+            tk.Checkbutton(tl, text=text, variable=var, bg=BG_COLOR, fg=TEXT_COLOR, selectcolor=PANEL_BG,
+                           activebackground=BG_COLOR, activeforeground=TEXT_COLOR, highlightthickness=0,
+                           font=('Segoe UI', 10)).pack(anchor='w')
+        tk.Frame(tl, bg=BG_COLOR, height=15).pack()
+
         row3 = tk.Frame(tl, bg=BG_COLOR)
         row3.pack(anchor='w')
         self.batch_start_btn = PillButton(row3, text="Start", w=100, command=self.start_batch_conversion)
@@ -479,15 +589,10 @@ class SVOConverterApp:
         bot = tk.Frame(frame, bg=BG_COLOR)
         bot.grid(row=2, column=0, columnspan=2, sticky='sew', pady=(30, 0))
         
-        # Single Graph Header with Percentage
-        h1 = tk.Frame(bot, bg=BG_COLOR)
-        h1.pack(fill='x', pady=(0, 5))
-        tk.Label(h1, text="Single Conversion Progress", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(side='left')
-        self.batch_single_pct_lbl = tk.Label(h1, text="0%", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold'))
-        self.batch_single_pct_lbl.pack(side='right')
-        
-        self.batch_single_graph = ProgressGraph(bot, GRAPH_PURPLE, GRAPH_PINK, title="")
-        self.batch_single_graph.pack(fill='x', pady=(0, 20))
+        # One graph per worker slot, rebuilt when a batch starts
+        self.batch_slots_frame = tk.Frame(bot, bg=BG_COLOR)
+        self.batch_slots_frame.pack(fill='x', pady=(0, 20))
+        self._build_batch_slots(1)
 
         # Overall Graph Header with Percentage
         h2 = tk.Frame(bot, bg=BG_COLOR)
@@ -501,6 +606,32 @@ class SVOConverterApp:
 
         return "Batch Conversion", frame
 
+    def _build_sampling_options(self, parent, stride_var, scale_var):
+        # "Every Nth frame" and output resolution controls shared by the export panels
+        row = tk.Frame(parent, bg=BG_COLOR)
+        row.pack(anchor='w', pady=(0, 10))
+        tk.Label(row, text="Every Nth Frame:", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(side='left', padx=(0, 8))
+        tk.Spinbox(row, from_=1, to=1000, textvariable=stride_var, width=5, bg=ENTRY_BG, fg=TEXT_COLOR,
+                   buttonbackground=PANEL_BG, insertbackground=TEXT_COLOR, relief='flat',
+                   font=('Segoe UI', 11), justify='center').pack(side='left')
+        tk.Label(parent, text="Resolution:", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=(0, 5))
+        rf = tk.Frame(parent, bg=BG_COLOR)
+        rf.pack(anchor='w', pady=(0, 10))
+        CanvasRadio(rf, text='Full', variable=scale_var, value='1', w=70).pack(side='left')
+        CanvasRadio(rf, text='1/2', variable=scale_var, value='0.5', w=80).pack(side='left')
+        CanvasRadio(rf, text='1/4', variable=scale_var, value='0.25', w=100).pack(side='left')
+        tk.Checkbutton(parent, text="Profile export (stage timings in the log)", variable=self.profile_var,
+                       bg=BG_COLOR, fg=TEXT_COLOR, selectcolor=PANEL_BG, activebackground=BG_COLOR,
+                       activeforeground=TEXT_COLOR, highlightthickness=0, font=('Segoe UI', 10)).pack(anchor='w', pady=(0, 10))
+
+    def _sampling(self, stride_var, scale_var):
+        # (stride, scale) selected in an export panel
+        try:
+            stride = max(1, int(stride_var.get()))
+        except ValueError:
+            stride = 1
+        return stride, float(scale_var.get())
+
     def _create_trim_tab(self, parent):
         frame = tk.Frame(parent, bg=BG_COLOR)
         frame.grid_columnconfigure(0, weight=3)
@@ -560,6 +691,18 @@ class SVOConverterApp:
         self.trim_end_time_lbl = tk.Label(ef_container, text="00:00:00", bg=TIME_ENTRY_BG, fg="white", font=('Consolas', 10, 'bold'), anchor='w', padx=5, pady=4)
         self.trim_end_time_lbl.pack(fill='x')
 
+        # Ranges exported together in one pass over the SVO (Mark In/Out + Add, or a CSV of events)
+        rg_head = tk.Frame(left, bg=BG_COLOR)
+        rg_head.pack(fill='x', pady=(0, 5))
+        tk.Label(rg_head, text="Ranges", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10)).pack(side='left')
+        PillButton(rg_head, text="Clear", w=70, h=26, command=self._clear_trim_ranges).pack(side='right', padx=(5, 0))
+        PillButton(rg_head, text="Remove", w=80, h=26, command=self._remove_trim_range).pack(side='right', padx=(5, 0))
+        PillButton(rg_head, text="Load CSV", w=90, h=26, command=self._load_trim_ranges).pack(side='right', padx=(5, 0))
+        PillButton(rg_head, text="Add Range", w=100, h=26, command=self._add_trim_range).pack(side='right')
+        self.trim_ranges_list = tk.Listbox(left, height=4, bg=PANEL_BG, fg=TEXT_COLOR, font=('Consolas', 10), relief='flat',
+                                           highlightthickness=1, highlightbackground=BORDER_COLOR, selectbackground=BLUE_ACCENT)
+        self.trim_ranges_list.pack(fill='x', pady=(0, 20))
+
 
         # Bottom Graph with Percentage
         bot = tk.Frame(left, bg=BG_COLOR)
@@ -598,6 +741,7 @@ class SVOConverterApp:
         CanvasRadio(sf, text='Left', variable=self.svo_export_side, value='left', w=70).pack(side='left')
         CanvasRadio(sf, text='Right', variable=self.svo_export_side, value='right', w=80).pack(side='left')
         CanvasRadio(sf, text='Both (full)', variable=self.svo_export_side, value='both', w=100).pack(side='left')
+        self._build_sampling_options(right, self.svo_export_stride, self.svo_export_scale)
 
         # Side selector for SVO Preview
         tk.Label(right, text="Preview Side:", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=(0, 5))
@@ -721,6 +865,13 @@ class SVOConverterApp:
         CanvasRadio(sf, text='Left', variable=self.avi_export_side, value='left', w=70).pack(side='left')
         CanvasRadio(sf, text='Right', variable=self.avi_export_side, value='right', w=80).pack(side='left')
         CanvasRadio(sf, text='Both (full)', variable=self.avi_export_side, value='both', w=100).pack(side='left')
+        self._build_sampling_options(right, self.avi_export_stride, self.avi_export_scale)
+        pr = tk.Frame(right, bg=BG_COLOR)
+        pr.pack(anchor='w', pady=(0, 10))
+        tk.Label(pr, text="Processes:", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(side='left', padx=(0, 8))
+        tk.Spinbox(pr, from_=1, to=max(1, os.cpu_count() or 1), textvariable=self.avi_export_processes, width=5, bg=ENTRY_BG,
+                   fg=TEXT_COLOR, buttonbackground=PANEL_BG, insertbackground=TEXT_COLOR, relief='flat',
+                   font=('Segoe UI', 11), justify='center').pack(side='left')
 
         # Side selector for AVI Preview
         tk.Label(right, text="Preview Side:", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=(0, 5))
@@ -798,56 +949,91 @@ class SVOConverterApp:
         self.log_queue.put((message, target))
 
     def log_error(self, target, pct):
-        self.progress_queue.put((target, pct, 0.0, True))
+        with self.progress_lock:
+            self.progress_errors.append((target, pct))
+
+    def post_progress(self, target, pct, speed, detail=''):
+        # `detail` replaces the plain percentage shown next to the graph
+        with self.progress_lock:
+            self.progress_latest[target] = (pct, speed, detail)
+
+    def _progress_widgets(self, target):
+        if target.startswith('batch_slot_'):
+            slot = self.batch_slots[int(target.rsplit('_', 1)[1])]
+            return slot['graph'], slot['pct_lbl']
+        return {'batch_overall': (self.batch_overall_graph, self.batch_overall_pct_lbl),
+                'trim': (self.trim_overall_graph, self.trim_overall_pct_lbl),
+                'avi': (self.avi_overall_graph, self.avi_overall_pct_lbl)}[target]
 
     def process_queues(self):
         try:
-            while not self.log_queue.empty():
-                msg, target = self.log_queue.get_nowait()
+            # The lines of each log are appended with a single insert per tick
+            pending = {}
+            try:
+                while True:
+                    msg, target = self.log_queue.get_nowait()
+                    pending.setdefault(target, []).append(msg)
+            except queue.Empty: pass
+            for target, msgs in pending.items():
                 w = self.batch_log_text if target == 'batch' else (self.trim_log_text if target == 'trim' else self.avi_log_text)
-                w.config(state='normal')
-                w.insert('end', msg)
-                w.see('end')
-                w.config(state='disabled')
-        except queue.Empty: pass
-
-        try:
-            while not self.progress_queue.empty():
-                target, pct, speed, is_err = self.progress_queue.get_nowait()
-                if target == 'batch_single':
-                    if is_err: 
-                        self.batch_single_graph.mark_error(pct)
-                    else: 
-                        self.batch_single_graph.update_graph(pct, speed)
-                        self.batch_single_pct_lbl.config(text=f"{int(pct)}%")
-                elif target == 'batch_overall':
-                    if is_err: 
-                        self.batch_overall_graph.mark_error(pct)
-                    else: 
-                        self.batch_overall_graph.update_graph(pct, speed)
-                        self.batch_overall_pct_lbl.config(text=f"{int(pct)}%")
-                elif target == 'trim':
-                    if is_err: 
-                        self.trim_overall_graph.mark_error(pct)
-                    else: 
-                        self.trim_overall_graph.update_graph(pct, speed)
-                        self.trim_overall_pct_lbl.config(text=f"{int(pct)}%")
-                elif target == 'avi':
-                    if is_err: 
-                        self.avi_overall_graph.mark_error(pct)
-                    else: 
-                        self.avi_overall_graph.update_graph(pct, speed)
-                        self.avi_overall_pct_lbl.config(text=f"{int(pct)}%")
-        except queue.Empty: pass
+                self._append_log(w, ''.join(msgs))
+
+            with self.progress_lock:
+                latest, self.progress_latest = self.progress_latest, {}
+                errors, self.progress_errors = self.progress_errors, []
+            for target, pct in errors:
+                self._progress_widgets(target)[0].mark_error(pct)
+            for target, (pct, speed, detail) in latest.items():
+                graph, pct_lbl = self._progress_widgets(target)
+                graph.update_graph(pct, speed)
+                pct_lbl.config(text=detail or f"{int(pct)}%")
         finally:
-            self.root.after(50, self.process_queues)
+            self.root.after(PROGRESS_POLL_MS, self.process_queues)
+
+    def _append_log(self, w, text):
+        # Append to a log widget, dropping its oldest lines beyond LOG_MAX_LINES
+        w.config(state='normal')
+        w.insert('end', text)
+        excess = int(w.index('end-1c').split('.')[0]) - LOG_MAX_LINES
+        if excess > 0:
+            w.delete('1.0', f'{excess + 1}.0')
+        w.see('end')
+        w.config(state='disabled')
+
+    def _format_progress(self, event):
+        text = f"{int(event['percent'])}%  ·  {event['fps']:.1f} fps"
+        if event.get('eta_s') is not None:
+            text += f"  ·  ETA {datetime.timedelta(seconds=int(event['eta_s']))}"
+        return text
+
+    def _run_export(self, worker, log_target, prefix, on_progress, on_error, **options):
+        # Run one svo_export job on a reused worker process, relaying its events to the GUI. A stopped
+        # conversion continues where it was when it is run again: the AVI written so far is kept as a
+        # segment and joined with the rest by an ffmpeg stream copy. Without ffmpeg that join would decode
+        # and re-encode the whole file, so the file is converted again from the start instead. By default
+        # the only checkpoint is saved when the job stops, and an uninterrupted job writes one segment that
+        # is renamed into place; periodic checkpoints are opt-in. Multi-range jobs are not checkpointed.
+        if not options.get('ranges') and shutil.which('ffmpeg'):
+            options.update(resume=True, checkpoint_frames=CHECKPOINT_FRAMES if self.checkpoint_var.get() else 0)
+        def on_event(event):
+            # Stop may have been pressed while the job was being handed to the worker
+            if self.stop_event.is_set(): worker.cancel()
+            if event['event'] == 'progress':
+                on_progress(event)
+            elif event['event'] in ('warning', 'error'):
+                self.log(f"{prefix}{event['message']}\n", log_target)
+                if event['event'] == 'error': on_error()
+            elif event['event'] == 'profile':
+                self.log(format_summary(event['summary']) + "\n", log_target)
+        return worker.run(on_event=on_event, **options)
 
     def stop_conversion(self):
         self.log("Stopping process...\n", "batch")
         self.log("Stopping process...\n", "trim")
         self.log("Stopping process...\n", "avi")
         self.stop_event.set()
-        if self.running_process: self.running_process.terminate()
+        for worker in self.export_workers + [self.trim_worker]:
+            if worker: worker.cancel()
 
     # ── Speed tracker ──────────────────────────────────────────────────────
     class Tracker:
@@ -868,18 +1054,54 @@ class SVOConverterApp:
 
     # ── Batch Threading ────────────────────────────────────────────────────
     def start_batch_conversion(self):
+        if not ZED_AVAILABLE:
+            self.log("ZED SDK not available.\n", "batch")
+            return
+        try:
+            workers = max(1, int(self.batch_workers_var.get()))
+        except ValueError:
+            workers = 1
+            self.batch_workers_var.set("1")
+
         self.batch_start_btn.set_state('disabled')
         self.batch_stop_btn.set_state('normal')
         self.stop_event.clear()
         
-        self.batch_single_graph.clear()
+        self._build_batch_slots(workers)
         self.batch_overall_graph.clear()
-        self.batch_single_pct_lbl.config(text="0%")
         self.batch_overall_pct_lbl.config(text="0%")
         
-        threading.Thread(target=self._run_batch, daemon=True).start()
-
-    def _run_batch(self):
+        threading.Thread(target=self._run_batch, args=(workers,), daemon=True).start()
+
+    def _build_batch_slots(self, count):
+        for child in self.batch_slots_frame.winfo_children(): child.destroy()
+        self.batch_slots = []
+
+        cols = min(count, 4)
+        rows = -(-count // cols)
+        graph_h = 80 if rows == 1 else (50 if rows <= 2 else 30)
+        for c in range(cols): self.batch_slots_frame.grid_columnconfigure(c, weight=1, uniform='slot')
+
+        for k in range(count):
+            cell = tk.Frame(self.batch_slots_frame, bg=BG_COLOR)
+            cell.grid(row=k // cols, column=k % cols, sticky='ew', padx=(0 if k % cols == 0 else 10, 0), pady=(0, 5))
+            hdr = tk.Frame(cell, bg=BG_COLOR)
+            hdr.pack(fill='x', pady=(0, 5))
+            name_lbl = tk.Label(hdr, text="Single Conversion Progress", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold'), anchor='w')
+            name_lbl.pack(side='left')
+            pct_lbl = tk.Label(hdr, text="0%", bg=BG_COLOR, fg=TEXT_COLOR, font=('Segoe UI', 10, 'bold'))
+            pct_lbl.pack(side='right')
+            graph = ProgressGraph(cell, GRAPH_PURPLE, GRAPH_PINK, title="", height=graph_h)
+            graph.pack(fill='x')
+            self.batch_slots.append({'graph': graph, 'pct_lbl': pct_lbl, 'name_lbl': name_lbl})
+
+    def _reset_batch_slot(self, k, name):
+        slot = self.batch_slots[k]
+        slot['graph'].clear()
+        slot['pct_lbl'].config(text="0%")
+        slot['name_lbl'].config(text=name)
+
+    def _run_batch(self, workers):
         in_d = self.batch_input_dir.get()
         out_d = self.batch_output_dir.get()
         if not os.path.isdir(in_d) or not os.path.isdir(out_d):
@@ -888,52 +1110,130 @@ class SVOConverterApp:
             return
 
         files = [f for f in os.listdir(in_d) if f.endswith(('.svo', '.svo2'))]
+        if not files:
+            self.log("No SVO files found.\n", "batch")
+            self.root.after(0, lambda: self._reset_batch_btns())
+            return
+
+        # Skip the files converted by an earlier batch with the same settings (only a stat() each)
+        options = self._batch_export_options()
+        manifest = Manifest(out_d, fingerprints=self.batch_fingerprint_var.get())
+        if not self.batch_force_var.get():
+            pending = [f for f in files
+                       if not manifest.is_current(os.path.join(in_d, f), options, self._batch_output_file(out_d, f))]
+            manifest.save()
+            if len(pending) < len(files):
+                self.log(f"Skipping {len(files) - len(pending)} file(s) already converted with the same settings.\n", "batch")
+            files = pending
         total_f = len(files)
         if total_f == 0:
-            self.log("No SVO files found.\n", "batch")
+            self.log("Nothing new to convert.\n", "batch")
             self.root.after(0, lambda: self._reset_batch_btns())
             return
 
-        overall_trk = self.Tracker()
+        jobs = queue.Queue()
+        for i, f in enumerate(files): jobs.put((i, f))
+
+        # Overall progress is the mean of every file's own progress, its speed the sum of the workers' fps
+        workers = min(workers, total_f)
+        batch = {'file_pct': [0.0] * total_f, 'slot_fps': [0.0] * workers, 'last_pct': 0.0, 'lock': threading.Lock(),
+                 'started': 0, 'probed': {}, 'prefetch': threading.Condition()}
+        self.log(f"Converting {total_f} files with {workers} parallel job(s).\n", "batch")
+        threading.Thread(target=self._prefetch_batch, args=(files, in_d, batch, workers), daemon=True).start()
+
+        while len(self.export_workers) < workers: self.export_workers.append(svo_export.ExportWorker())
+
+        threads = [threading.Thread(target=self._batch_worker, args=(k, jobs, in_d, out_d, batch, workers > 1, options, manifest),
+                                    daemon=True)
+                   for k in range(workers)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        with batch['prefetch']:
+            batch['started'] = total_f
+            batch['prefetch'].notify_all()
+
+        self.log("Batch finished.\n", "batch")
+        self.root.after(0, lambda: self._reset_batch_btns())
+
+    def _prefetch_batch(self, files, in_d, batch, ahead):
+        # Warm up and check the files that come next, while the current ones are converted: at most `ahead`
+        # files past those already started, so the page cache is not flooded. Broken files are flagged
+        # here and skipped by the workers when their turn comes.
+        cond = batch['prefetch']
         for i, f in enumerate(files):
-            if self.stop_event.is_set(): break
+            with cond:
+                while i >= batch['started'] + ahead and not self.stop_event.is_set():
+                    cond.wait(0.5)
+                if i < batch['started']: continue   # a worker already has it
+            if self.stop_event.is_set(): return
+            error = svo_export.probe_svo(os.path.join(in_d, f))
+            with cond:
+                batch['probed'][i] = error
+            if error:
+                self.log(f"{f} will be skipped: {error}\n", "batch")
+
+    def _batch_export_options(self):
+        # svo_export options of a batch conversion, also recorded in the manifest
+        return {'mode': 0}
+
+    def _batch_output_file(self, out_d, f):
+        return os.path.join(out_d, os.path.splitext(f)[0] + '.avi')
+
+    def _batch_worker(self, k, jobs, in_d, out_d, batch, tag_lines, options, manifest):
+        target = f'batch_slot_{k}'
+        while not self.stop_event.is_set():
+            try:
+                i, f = jobs.get_nowait()
+            except queue.Empty:
+                break
+            with batch['prefetch']:
+                batch['started'] += 1
+                batch['prefetch'].notify_all()
+                error = batch['probed'].get(i)
+            self.root.after(0, lambda f=f: self._reset_batch_slot(k, f))
+            if error:
+                self.log(f"Skipping {f}: {error}\n", "batch")
+                self.log_error(target, 0.0)
+                self._update_batch_overall(batch, k, i, 100.0, 0.0)
+                continue
             self.log(f"Processing {f}...\n", "batch")
+            prefix = f"[{f}] " if tag_lines else ""
             
-            self.batch_single_graph.clear()
-            self.root.after(0, lambda: self.batch_single_pct_lbl.config(text="0%"))
-            single_trk = self.Tracker()
+            last_pct = [0.0]
             
-            base_name = os.path.splitext(f)[0]
-            out_file = os.path.join(out_d, f'{base_name}.avi')
+            in_file = os.path.join(in_d, f)
+            out_file = self._batch_output_file(out_d, f)
             
-            cmd = ['python', '-u', 'svo_export.py', '--mode', '0', 
-                   '--input_svo_file', os.path.join(in_d, f), 
-                   '--output_avi_file', out_file]
+            def on_progress(event):
+                last_pct[0] = event['percent']
+                self.post_progress(target, event['percent'], event['fps'], self._format_progress(event))
+                self._update_batch_overall(batch, k, i, event['percent'], event['fps'])
+
+            def on_error():
+                self.log_error(target, last_pct[0])
+                self.log_error('batch_overall', batch['last_pct'])
+
             try:
-                cf = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-                self.running_process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, creationflags=cf)
-                for line in iter(self.running_process.stdout.readline, ''):
-                    if self.stop_event.is_set(): break
-                    m = re.search(r'(\d+)%', line)
-                    if m:
-                        pct = int(m.group(1))
-                        self.progress_queue.put(('batch_single', pct, single_trk.update(pct), False))
-                        self.progress_queue.put(('batch_overall', ((i * 100) + pct) / total_f, overall_trk.update(((i * 100) + pct) / total_f), False))
-                    elif 'Converting SVO' not in line.strip():
-                        self.log(line, "batch")
-                        if "Error" in line or "Exception" in line:
-                            self.log_error('batch_single', single_trk.last_pct)
-                            self.log_error('batch_overall', overall_trk.last_pct)
-                rc = self.running_process.wait()
-                if rc != 0 and not self.stop_event.is_set(): self.log_error('batch_single', single_trk.last_pct)
+                rc = self._run_export(self.export_workers[k], "batch", prefix, on_progress, on_error,
+                                      input_svo_file=in_file, output_avi_file=out_file, **options)
+                if rc == 0: manifest.record(in_file, options, out_file)
+                elif not self.stop_event.is_set(): self.log_error(target, last_pct[0])
             except Exception as e:
-                self.log(f"Fatal error: {e}\n", "batch")
-                self.log_error('batch_single', single_trk.last_pct)
+                self.log(f"{prefix}Fatal error: {e}\n", "batch")
+                self.log_error(target, last_pct[0])
             finally:
-                self.running_process = None
-
-        self.log("Batch finished.\n", "batch")
-        self.root.after(0, lambda: self._reset_batch_btns())
+                # A finished file counts as done in the overall progress, converted or failed; a stopped
+                # one keeps its progress
+                self._update_batch_overall(batch, k, i, last_pct[0] if self.stop_event.is_set() else 100.0, 0.0)
+
+    def _update_batch_overall(self, batch, k, i, pct, fps):
+        with batch['lock']:
+            batch['file_pct'][i] = pct
+            batch['slot_fps'][k] = fps
+            overall = sum(batch['file_pct']) / len(batch['file_pct'])
+            total_fps = sum(batch['slot_fps'])
+            batch['last_pct'] = overall
+            self.post_progress('batch_overall', overall, total_fps, f"{int(overall)}%  ·  {total_fps:.1f} fps")
 
     def _reset_batch_btns(self):
         self.batch_start_btn.set_state('normal')
@@ -945,63 +1245,151 @@ class SVOConverterApp:
         if not ZED_AVAILABLE:
             self.log("ZED SDK not available.\n", "trim")
             return
-        if self.trim_video_capture: self.trim_video_capture.close()
+        if self.is_playing: self._toggle_trim_playback()
+        self.trim_decoder.cancel()
+        with self.trim_decoder.busy:
+            if self.trim_video_capture: self.trim_video_capture.close()
+            self.trim_video_capture = None
         
         zed = sl.Camera()
         ip = sl.InitParameters()
         ip.set_from_svo_file(path)
         ip.svo_real_time_mode = False
+        # The player only shows images: without a depth mode, scrubbing and playback grabs skip depth
+        ip.depth_mode = sl.DEPTH_MODE.NONE
         if zed.open(ip) != sl.ERROR_CODE.SUCCESS:
             self.trim_video_label.config(text="Error loading SVO", image='')
             return
             
-        self.trim_video_capture = zed
+        with self.trim_decoder.busy:
+            self.trim_video_capture = zed
+        if self.trim_video_path: self.preview_cache.invalidate(self.trim_video_path)
+        self.trim_video_path = path
         self.trim_total_frames = zed.get_svo_number_of_frames()
         self.trim_fps = zed.get_camera_information().camera_configuration.fps or 30
         self.trim_timeline.config(to=self.trim_total_frames-1)
-        
-        self._on_trim_seek(0)
-        self.trim_timeline_var.set(0)
-        self._set_trim_start()
-        
-        self._on_trim_seek(self.trim_total_frames - 1)
+        self._start_trim_index(path)
+
+        # The marks span the whole recording; only frame 0 is decoded
         self.trim_timeline_var.set(self.trim_total_frames - 1)
         self._set_trim_end()
+        self.trim_timeline_var.set(0)
+        self._set_trim_start()
         self._on_trim_seek(0)
 
+    def _start_trim_index(self, path):
+        # Thumbnails for scrubbing: from the cache of an earlier load, or indexed by a background pass.
+        # Both read the file (for its fingerprint first), so neither runs on the Tk thread.
+        self.trim_index_stop.set()
+        self.trim_index_stop = threading.Event()
+        self.trim_index = ThumbnailIndex(path)
+        threading.Thread(target=self._build_trim_index, args=(self.trim_index, self.trim_index_stop), daemon=True).start()
+
+    def _build_trim_index(self, index, stop):
+        name = os.path.basename(index.path)
+        try:
+            if index.load() or stop.is_set(): return
+            self.log(f"Indexing thumbnails of {name}...\n", "trim")
+            if index.build(stop):
+                self.log(f"Thumbnail index of {name} ready.\n", "trim")
+        except Exception as e:
+            self.log(f"Thumbnail indexing of {name} failed: {e}\n", "trim")
+
     def _refresh_trim_preview(self):
         if self.trim_video_capture:
             self._on_trim_seek(self.trim_timeline_var.get())
 
     def _on_trim_seek(self, val):
         n = int(float(val))
+        if self.is_playing: self._toggle_trim_playback()
+        if self.trim_settle_id:
+            self.root.after_cancel(self.trim_settle_id)
+            self.trim_settle_id = None
         if self.trim_video_capture:
-            self.trim_video_capture.set_svo_position(n)
-            z_img = sl.Mat()
-            if self.trim_video_capture.grab() == sl.ERROR_CODE.SUCCESS:
-                
-                # Check preview side option
-                side = self.svo_preview_side.get()
-                if side == 'left':
-                    self.trim_video_capture.retrieve_image(z_img, sl.VIEW.LEFT)
-                elif side == 'right':
-                    self.trim_video_capture.retrieve_image(z_img, sl.VIEW.RIGHT)
-                else:
-                    self.trim_video_capture.retrieve_image(z_img, sl.VIEW.SIDE_BY_SIDE)
-                    
-                rgb = cv2.cvtColor(z_img.get_data(), cv2.COLOR_BGRA2RGB)
-                self._overlay_frame_num(rgb, n)
-                self._show_frame_on_label(self.trim_video_label, rgb)
+            side = self.svo_preview_side.get()
+            lbl = self.trim_video_label
+            size = (lbl.winfo_width(), lbl.winfo_height())
+            thumb = self.trim_index.thumbnail(n, side) if self.trim_index else None
+            if thumb is not None and self.preview_cache.get(self.trim_video_path, n, side, size) is None:
+                # While the slider moves, show the indexed thumbnail and decode the full frame once it rests
+                self.trim_decoder.cancel()
+                self.preview_seq += 1
+                self._display_preview(lbl, n, scale_to_fit(thumb, *size), self.preview_seq)
+                self.trim_settle_id = self.root.after(SCRUB_SETTLE_MS, self._settle_trim_preview, n, side)
+            else:
+                self._show_preview(self.trim_decoder, lbl, self.trim_video_path, n, side, self._decode_trim_frame)
         
-        t_cur = self._format_time(n, self.trim_fps)
-        t_tot = self._format_time(self.trim_total_frames, self.trim_fps)
+        t_cur = self._format_trim_time(n)
+        t_tot = self._format_trim_time(self.trim_total_frames - 1)
         self.trim_time_lbl.config(text=f"{t_cur} / {t_tot}")
 
+    def _settle_trim_preview(self, n, side):
+        self.trim_settle_id = None
+        if self.trim_video_capture:
+            self._show_preview(self.trim_decoder, self.trim_video_label, self.trim_video_path, n, side,
+                               self._decode_trim_frame)
+
+    def _format_trim_time(self, n):
+        # Recorded time of frame n once the SVO is indexed, otherwise derived from the frame rate
+        seconds = self.trim_index.seconds(n) if self.trim_index else None
+        if seconds is None:
+            return self._format_time(n, self.trim_fps)
+        return str(datetime.timedelta(seconds=int(seconds)))
+
+    def _decode_trim_frame(self, n, side):
+        # Full-size RGB frame n of the loaded SVO for a preview side, None when it cannot be grabbed
+        self.trim_video_capture.set_svo_position(n)
+        if self.trim_video_capture.grab() != sl.ERROR_CODE.SUCCESS:
+            return None
+        z_img = sl.Mat()
+        if side == 'left':
+            self.trim_video_capture.retrieve_image(z_img, sl.VIEW.LEFT)
+        elif side == 'right':
+            self.trim_video_capture.retrieve_image(z_img, sl.VIEW.RIGHT)
+        else:
+            self.trim_video_capture.retrieve_image(z_img, sl.VIEW.SIDE_BY_SIDE)
+        return cv2.cvtColor(z_img.get_data(), cv2.COLOR_BGRA2RGB)
+
+    def _show_preview(self, decoder, lbl, path, n, side, decode):
+        # Show frame n on a player label: right away when it is in the preview cache at this size,
+        # otherwise once the player's decoder has decoded it (a newer request replaces this one)
+        self.preview_seq += 1
+        size = (lbl.winfo_width(), lbl.winfo_height())
+        rgb = self.preview_cache.get(path, n, side, size)
+        if rgb is not None:
+            decoder.cancel()
+            self._display_preview(lbl, n, rgb, self.preview_seq)
+            return
+        decoder.request((lbl, path, n, side, size, decode, self.preview_seq))
+
+    def _decode_preview(self, request):
+        # Decoder thread: decode, scale and cache a requested frame
+        lbl, path, n, side, size, decode, seq = request
+        rgb = decode(n, side)
+        if rgb is None: return None
+        rgb = resize_for_preview(rgb, *size)
+        self.preview_cache.put(path, n, side, size, rgb)
+        return rgb
+
+    def _deliver_preview(self, request, rgb):
+        if rgb is not None:
+            lbl, path, n, side, size, decode, seq = request
+            self.root.after(0, self._display_preview, lbl, n, rgb, seq)
+
+    def _display_preview(self, lbl, n, rgb, seq):
+        if seq < self.preview_shown.get(lbl, 0): return
+        self.preview_shown[lbl] = seq
+        rgb = rgb.copy()
+        self._overlay_frame_num(rgb, n)
+        self._show_frame_on_label(lbl, rgb)
+
     def _show_frame_on_label(self, lbl, rgb):
+        # Each label keeps one PhotoImage that is repainted in place while the frame size does not change
         img = Image.fromarray(rgb)
-        w, h = lbl.winfo_width(), lbl.winfo_height()
-        if w > 10 and h > 10:
-            img.thumbnail((w, h), Image.Resampling.LANCZOS)
+        photo = getattr(lbl, 'image', None)
+        if photo is not None and lbl.cget('image') == str(photo) and (photo.width(), photo.height()) == img.size:
+            photo.paste(img)
+            return
         photo = ImageTk.PhotoImage(img)
         lbl.config(image=photo)
         lbl.image = photo
@@ -1010,21 +1398,44 @@ class SVOConverterApp:
         if self.is_playing:
             self.is_playing = False
             self.trim_play_btn.set_icon('play')
-        else:
+            if self.trim_playback: self.trim_playback.stop()
+            self.trim_playback = None
+            # Playback frames are scaled with the fast filter, the paused frame is shown again with LANCZOS
+            if self.trim_video_capture:
+                self._show_preview(self.trim_decoder, self.trim_video_label, self.trim_video_path,
+                                   int(self.trim_timeline_var.get()), self.svo_preview_side.get(), self._decode_trim_frame)
+        elif self.trim_video_capture:
             self.is_playing = True
             self.trim_play_btn.set_icon('pause')
+            self.trim_decoder.cancel()
+            lbl = self.trim_video_label
+            size = (lbl.winfo_width(), lbl.winfo_height())
+            self.trim_playback = Playback(SvoSource(self.trim_video_capture, self.svo_preview_side.get()),
+                                          int(self.trim_timeline_var.get()) + 1, self.trim_total_frames, self.trim_fps,
+                                          prepare=lambda rgb: resize_for_preview(rgb, *size, fast=True), lock=self.trim_decoder.busy)
             self._trim_play_loop()
 
     def _trim_play_loop(self):
         if not self.is_playing: return
-        nxt = int(self.trim_timeline_var.get()) + 1
-        if nxt < self.trim_total_frames:
-            self.trim_timeline_var.set(nxt)
-            self._on_trim_seek(nxt)
-            delay = int(1000/self.trim_fps) if self.trim_fps else 33
-            self.root.after(delay, self._trim_play_loop)
-        else:
+        self._present_playback(self.trim_playback, self.trim_video_label, self.trim_timeline_var, self.trim_time_lbl,
+                               self.trim_fps, self.trim_total_frames)
+        if self.trim_playback.finished:
             self._toggle_trim_playback()
+        else:
+            self.root.after(self.trim_playback.delay_ms(), self._trim_play_loop)
+
+    def _present_playback(self, playback, lbl, timeline_var, time_lbl, fps, total):
+        # Show the frame due now (late frames are skipped) with the measured playback rate
+        item = playback.next_frame()
+        if item is None: return
+        n, rgb = item
+        self.preview_seq += 1
+        self.preview_shown[lbl] = self.preview_seq
+        timeline_var.set(n)
+        self._overlay_frame_num(rgb, n)
+        self._show_frame_on_label(lbl, rgb)
+        time_lbl.config(text=f"{self._format_time(n, fps)} / {self._format_time(total, fps)}  "
+                             f"{playback.fps():.1f} fps, {playback.dropped} dropped")
 
     def _set_trim_start(self):
         self.trim_start_frame = int(self.trim_timeline_var.get())
@@ -1058,6 +1469,44 @@ class SVOConverterApp:
             else: self.end_frame_var.set(str(self.trim_end_frame))
         except ValueError: self.end_frame_var.set(str(self.trim_end_frame))
 
+    def _add_trim_range(self):
+        # The marked frames, Mark Out included: the range ends after it and is named START_END like the
+        # ranges of --ranges and CSV files
+        if self.trim_end_frame < self.trim_start_frame: return
+        frame_range = FrameRange(self.trim_start_frame, self.trim_end_frame + 1)
+        if any(r.name.lower() == frame_range.name.lower() for r in self.trim_ranges):
+            self.log(f"Range {frame_range.name} is already in the list.\n", "trim")
+            return
+        self.trim_ranges.append(frame_range)
+        self._refresh_trim_ranges()
+
+    def _load_trim_ranges(self):
+        p = filedialog.askopenfilename(filetypes=[('CSV', '*.csv'), ('All files', '*.*')])
+        if not p: return
+        try:
+            ranges = load_ranges(p)
+            check_range_names(self.trim_ranges + ranges)
+        except (OSError, ValueError) as e:
+            self.log(f"Error loading ranges: {e}\n", "trim")
+            return
+        self.trim_ranges.extend(ranges)
+        self._refresh_trim_ranges()
+        self.log(f"Loaded {len(ranges)} ranges from {os.path.basename(p)}\n", "trim")
+
+    def _remove_trim_range(self):
+        for k in reversed(self.trim_ranges_list.curselection()):
+            del self.trim_ranges[k]
+        self._refresh_trim_ranges()
+
+    def _clear_trim_ranges(self):
+        self.trim_ranges = []
+        self._refresh_trim_ranges()
+
+    def _refresh_trim_ranges(self):
+        self.trim_ranges_list.delete(0, 'end')
+        for r in self.trim_ranges:
+            self.trim_ranges_list.insert('end', f"{r.name:<20} {r.start}-{r.end}  ({r.end - r.start} frames)")
+
     def _capture_trim_frame(self):
         n = int(self.trim_timeline_var.get())
         self.log(f"Captured frame {n}\n", "trim")
@@ -1085,37 +1534,38 @@ class SVOConverterApp:
 
         base = os.path.splitext(os.path.basename(in_file))[0]
         out_file = os.path.join(out_dir, f'{base}_trimmed_{self.trim_start_frame}_{self.trim_end_frame}.avi')
-
-        cmd = ['python', '-u', 'svo_export.py', '--mode', '0',
-               '--input_svo_file', in_file,
-               '--output_avi_file', out_file,
-               '--start_frame', str(self.trim_start_frame),
-               '--end_frame',   str(self.trim_end_frame)]
-
-        trk = self.Tracker()
+        stride, scale = self._sampling(self.svo_export_stride, self.svo_export_scale)
+        ranges = list(self.trim_ranges)
+        range_options = {}
+        if ranges:
+            # One pass over the SVO, writing <base>_trimmed_<range name>.avi per range
+            out_file = os.path.join(out_dir, f'{base}_trimmed.avi')
+            range_options = {'ranges': format_ranges(ranges)}
+            self._log_range_plan(ranges, stride)
+
+        last_pct = [0.0]
+        def on_progress(event):
+            last_pct[0] = event['percent']
+            self.post_progress('trim', event['percent'], event['fps'], self._format_progress(event))
+
+        if self.trim_worker is None: self.trim_worker = svo_export.ExportWorker()
         try:
-            cf = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            self.running_process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, creationflags=cf)
-            for line in iter(self.running_process.stdout.readline, ''):
-                if self.stop_event.is_set(): break
-                m = re.search(r'(\d+)%', line)
-                if m:
-                    pct = int(m.group(1))
-                    self.progress_queue.put(('trim', pct, trk.update(pct), False))
-                elif 'Converting SVO' not in line.strip():
-                    self.log(line, "trim")
-            rc = self.running_process.wait()
+            rc = self._run_export(self.trim_worker, "trim", "", on_progress, lambda: self.log_error('trim', last_pct[0]),
+                                  mode=0, input_svo_file=in_file, output_avi_file=out_file,
+                                  start_frame=self.trim_start_frame, end_frame=self.trim_end_frame,
+                                  stride=stride, scale=scale, profile=self.profile_var.get(), **range_options)
             if rc == 0 and not self.stop_event.is_set():
-                self.progress_queue.put(('trim', 100, 0, False))
-                self.log(f'SUCCESS → {out_file}\n', "trim")
-            elif rc != 0:
-                self.log(f'ERROR: exit code {rc}.\n', "trim")
-                self.log_error('trim', trk.last_pct)
+                self.post_progress('trim', 100, 0)
+                if ranges:
+                    self.log(f'SUCCESS → {len(ranges)} files: {os.path.splitext(out_file)[0]}_*.avi\n', "trim")
+                else:
+                    self.log(f'SUCCESS → {out_file}\n', "trim")
+            elif rc != 0 and not self.stop_event.is_set():
+                self.log('ERROR: conversion failed.\n', "trim")
+                self.log_error('trim', last_pct[0])
         except Exception as e:
             self.log(f'FATAL ERROR: {e}\n', "trim")
-            self.log_error('trim', trk.last_pct)
-        finally:
-            self.running_process = None
+            self.log_error('trim', last_pct[0])
         
         self.root.after(0, lambda: self._reset_trim_btns())
 
@@ -1140,56 +1590,53 @@ class SVOConverterApp:
         in_file = self.trim_input_file.get()
         out_dir = self.trim_output_dir.get()
         side    = self.svo_export_side.get()
+        stride, scale = self._sampling(self.svo_export_stride, self.svo_export_scale)
         
         base = os.path.splitext(os.path.basename(in_file))[0]
-        image_folder = os.path.join(out_dir, f'{base}_frames_{side}_{self.trim_start_frame}_{self.trim_end_frame}')
-        os.makedirs(image_folder, exist_ok=True)
+        ranges = list(self.trim_ranges)
+        if ranges:
+            # One pass over the SVO, writing one folder per range
+            outputs = [(os.path.join(out_dir, f'{base}_frames_{side}_{r.name}'), r.frames(stride)) for r in ranges]
+            image_folder = os.path.join(out_dir, f'{base}_frames_{side}_*')
+        else:
+            image_folder = os.path.join(out_dir, f'{base}_frames_{side}_{self.trim_start_frame}_{self.trim_end_frame}')
+            outputs = [(image_folder, range(self.trim_start_frame, self.trim_end_frame + 1, stride))]
+        for folder, _ in outputs:
+            os.makedirs(folder, exist_ok=True)
         
         self.log(f'Exporting images from SVO (Side: {side})\nSaving to: {image_folder}\n', "trim")
+        if ranges: self._log_range_plan(ranges, stride)
 
-        zed = sl.Camera()
-        ip  = sl.InitParameters()
-        ip.set_from_svo_file(in_file)
-        ip.svo_real_time_mode = False
-        if zed.open(ip) != sl.ERROR_CODE.SUCCESS:
-            self.log('Error: Could not open SVO file.\n', "trim")
-            self.root.after(0, lambda: self._reset_trim_btns())
-            return
-
-        zed_img = sl.Mat()
-        total = max(1, self.trim_end_frame - self.trim_start_frame)
         trk = self.Tracker()
-        
-        view_mode = sl.VIEW.LEFT
-        if side == 'right': view_mode = sl.VIEW.RIGHT
-        elif side == 'both': view_mode = sl.VIEW.SIDE_BY_SIDE
-
+        prof = StageProfiler() if self.profile_var.get() else NULL_PROFILER
+        written = None
+        progress = lambda pct: self.post_progress('trim', pct, trk.update(pct))
         try:
-            for i, fn in enumerate(range(self.trim_start_frame, self.trim_end_frame + 1)):
-                if self.stop_event.is_set():
-                    self.log('Stopped by user.\n', "trim")
-                    break
-                zed.set_svo_position(fn)
-                if zed.grab() == sl.ERROR_CODE.SUCCESS:
-                    zed.retrieve_image(zed_img, view_mode)
-                    rgb = cv2.cvtColor(zed_img.get_data(), cv2.COLOR_BGRA2RGB)
-                    Image.fromarray(rgb).save(os.path.join(image_folder, f'frame_{str(fn).zfill(6)}.png'))
-                
-                pct = (i / total) * 100
-                self.progress_queue.put(('trim', pct, trk.update(pct), False))
-                
+            if ranges:
+                written = svo_images.export_svo_image_ranges(in_file, outputs, side, scale, stop=self.stop_event,
+                                                             progress=progress, profiler=prof)
+            else:
+                written = svo_images.export_svo_images(in_file, image_folder, outputs[0][1], side, scale,
+                                                       stop=self.stop_event, progress=progress, profiler=prof)
         except Exception as e:
             self.log(f'Error during SVO export: {e}\n', "trim")
             self.log_error('trim', trk.last_pct)
-        finally:
-            zed.close()
+        if prof.enabled: self.log(format_summary(prof.summary()) + "\n", "trim")
 
-        if not self.stop_event.is_set():
-            self.progress_queue.put(('trim', 100, 0, False))
-            self.log(f'SUCCESS: SVO image sequence exported.\n', "trim")
+        if self.stop_event.is_set():
+            self.log('Stopped by user.\n', "trim")
+        elif written is not None:
+            self.post_progress('trim', 100, 0)
+            self.log(f'SUCCESS: SVO image sequence exported ({written} frames).\n', "trim")
             
         self.root.after(0, lambda: self._reset_trim_btns())
 
+    def _log_range_plan(self, ranges, stride):
+        positions = [n for n, _ in visit_plan([r.frames(stride) for r in ranges])]
+        requested = sum(len(r.frames(stride)) for r in ranges)
+        self.log(f"{len(ranges)} ranges: {requested} frames, {len(positions)} decoded in one pass "
+                 f"with {count_seeks(positions, svo_images.MAX_GRAB_GAP)} seek(s).\n", "trim")
+
     def _reset_trim_btns(self):
         self.trim_start_btn.set_state('normal')
         self.trim_export_btn.set_state('normal')
@@ -1198,10 +1645,17 @@ class SVOConverterApp:
 
     # ── AVI Player Logic ───────────────────────────────────────────────────
     def _load_avi_video(self, path):
-        if self.avi_video_capture: self.avi_video_capture.release()
+        if self.avi_is_playing: self._toggle_avi_playback()
+        self.avi_decoder.cancel()
+        with self.avi_decoder.busy:
+            if self.avi_video_capture: self.avi_video_capture.release()
+            self.avi_video_capture = None
         cap = cv2.VideoCapture(path)
         if not cap.isOpened(): return
-        self.avi_video_capture = cap
+        with self.avi_decoder.busy:
+            self.avi_video_capture = cap
+        if self.avi_video_path: self.preview_cache.invalidate(self.avi_video_path)
+        self.avi_video_path = path
         self.avi_total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         self.avi_fps = cap.get(cv2.CAP_PROP_FPS) or 30
         self.avi_timeline.config(to=self.avi_total_frames-1)
@@ -1221,43 +1675,58 @@ class SVOConverterApp:
 
     def _on_avi_seek(self, val):
         n = int(float(val))
+        if self.avi_is_playing: self._toggle_avi_playback()
         if self.avi_video_capture:
-            self.avi_video_capture.set(cv2.CAP_PROP_POS_FRAMES, n)
-            ret, frame = self.avi_video_capture.read()
-            if ret:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Crop logic based on preview side
-                side = self.avi_preview_side.get()
-                w = frame.shape[1]
-                if side == 'left': frame = frame[:, :w//2]
-                elif side == 'right': frame = frame[:, w//2:]
-                
-                self._overlay_frame_num(frame, n)
-                self._show_frame_on_label(self.avi_video_label, frame)
+            side = self.avi_preview_side.get()
+            self._show_preview(self.avi_decoder, self.avi_video_label, self.avi_video_path, n, side,
+                               self._decode_avi_frame)
         
         t_cur = self._format_time(n, self.avi_fps)
         t_tot = self._format_time(self.avi_total_frames, self.avi_fps)
         self.avi_time_lbl.config(text=f"{t_cur} / {t_tot}")
 
+    def _decode_avi_frame(self, n, side):
+        # Full-size RGB frame n of the loaded AVI, cropped to a preview side
+        self.avi_video_capture.set(cv2.CAP_PROP_POS_FRAMES, n)
+        ret, frame = self.avi_video_capture.read()
+        if not ret:
+            return None
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        # Crop logic based on preview side
+        w = frame.shape[1]
+        if side == 'left': frame = frame[:, :w//2]
+        elif side == 'right': frame = frame[:, w//2:]
+        return frame
+
     def _toggle_avi_playback(self):
         if self.avi_is_playing:
             self.avi_is_playing = False
             self.avi_play_btn.set_icon('play')
-        else:
+            if self.avi_playback: self.avi_playback.stop()
+            self.avi_playback = None
+            if self.avi_video_capture:
+                self._show_preview(self.avi_decoder, self.avi_video_label, self.avi_video_path,
+                                   int(self.avi_timeline_var.get()), self.avi_preview_side.get(), self._decode_avi_frame)
+        elif self.avi_video_capture:
             self.avi_is_playing = True
             self.avi_play_btn.set_icon('pause')
+            self.avi_decoder.cancel()
+            lbl = self.avi_video_label
+            size = (lbl.winfo_width(), lbl.winfo_height())
+            self.avi_playback = Playback(AviSource(self.avi_video_capture, self.avi_preview_side.get()),
+                                         int(self.avi_timeline_var.get()) + 1, self.avi_total_frames, self.avi_fps,
+                                         prepare=lambda rgb: resize_for_preview(rgb, *size, fast=True), lock=self.avi_decoder.busy)
             self._avi_play_loop()
 
     def _avi_play_loop(self):
         if not self.avi_is_playing: return
-        nxt = int(self.avi_timeline_var.get()) + 1
-        if nxt < self.avi_total_frames:
-            self.avi_timeline_var.set(nxt)
-            self._on_avi_seek(nxt)
-            self.root.after(int(1000/self.avi_fps), self._avi_play_loop)
-        else:
+        self._present_playback(self.avi_playback, self.avi_video_label, self.avi_timeline_var, self.avi_time_lbl,
+                               self.avi_fps, self.avi_total_frames)
+        if self.avi_playback.finished:
             self._toggle_avi_playback()
+        else:
+            self.root.after(self.avi_playback.delay_ms(), self._avi_play_loop)
 
     def _set_avi_start(self): 
         self.avi_start_frame = int(self.avi_timeline_var.get())
@@ -1315,58 +1784,35 @@ class SVOConverterApp:
         in_file = self.avi_input_file.get()
         out_dir = self.avi_output_dir.get()
         side = self.avi_export_side.get()
+        stride, scale = self._sampling(self.avi_export_stride, self.avi_export_scale)
         base = os.path.splitext(os.path.basename(in_file))[0]
         image_folder = os.path.join(out_dir, f'{base}_{side}_{self.avi_start_frame}_{self.avi_end_frame}')
         os.makedirs(image_folder, exist_ok=True)
 
         self.log(f"Starting AVI Image Export (Side: {side})...\nOutput: {image_folder}\n", "avi")
-        
-        cap = cv2.VideoCapture(in_file)
-        if not cap.isOpened():
-            self.log('Error: Could not open AVI file.\n', 'avi')
-            self.root.after(0, lambda: self._reset_avi_btns())
-            return
 
-        total = max(1, self.avi_end_frame - self.avi_start_frame)
+        frame_numbers = range(self.avi_start_frame, self.avi_end_frame + 1, stride)
+        try:
+            processes = max(1, int(self.avi_export_processes.get()))
+        except ValueError:
+            processes = 1
         trk = self.Tracker()
-        errors = 0
-
+        prof = StageProfiler() if self.profile_var.get() else NULL_PROFILER
+        written = None
         try:
-            for i, fn in enumerate(range(self.avi_start_frame, self.avi_end_frame + 1)):
-                if self.stop_event.is_set():
-                    self.log('Stopped by user.\n', 'avi')
-                    break
-
-                cap.set(cv2.CAP_PROP_POS_FRAMES, fn)
-                ret, frame = cap.read()
-                if not ret:
-                    errors += 1
-                    if errors > 10:
-                        self.log(f'Too many read errors, aborting at frame {fn}.\n', 'avi')
-                        self.log_error('avi', trk.last_pct)
-                        break
-                    continue
-
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                w = frame.shape[1]
-                if side == 'left': frame = frame[:, :w // 2]
-                elif side == 'right': frame = frame[:, w // 2:]
-
-                out_path = os.path.join(image_folder, f'frame_{str(fn).zfill(6)}.png')
-                Image.fromarray(frame).save(out_path)
-
-                pct = (i / total) * 100
-                self.progress_queue.put(('avi', pct, trk.update(pct), False))
-
+            written = svo_images.export_avi_images(in_file, image_folder, frame_numbers, side, scale, stop=self.stop_event,
+                                                   progress=lambda pct: self.post_progress('avi', pct, trk.update(pct)),
+                                                   profiler=prof, processes=processes)
         except Exception as e:
             self.log(f'Error during AVI export: {e}\n', 'avi')
             self.log_error('avi', trk.last_pct)
-        finally:
-            cap.release()
+        if prof.enabled: self.log(format_summary(prof.summary()) + "\n", "avi")
 
-        if not self.stop_event.is_set():
-            self.progress_queue.put(('avi', 100, 0, False))
-            self.log(f"SUCCESS: {total - errors} frames exported.\n", "avi")
+        if self.stop_event.is_set():
+            self.log('Stopped by user.\n', 'avi')
+        elif written is not None:
+            self.post_progress('avi', 100, 0)
+            self.log(f"SUCCESS: {written} frames exported.\n", "avi")
             
         self.root.after(0, lambda: self._reset_avi_btns())
 
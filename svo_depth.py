@@ -0,0 +1,192 @@
+"""
+Chunked, memory-mapped depth archive written by svo_export.py (mode 4 with --depth_format npy).
+
+An archive is a folder holding:
+
+    depth_index.json          frame index and array layout
+    depth_chunk_00000.npy     uint16 array of shape (frames, height, width), depth in millimetres
+    depth_chunk_00001.npy     ...
+
+Every chunk is a plain .npy file, so a frame range can be sliced from a memory map without decoding
+anything. Read an archive with DepthArchive, or print a summary from the command line:
+
+    python svo_depth.py <archive folder>
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+INDEX_FILE = 'depth_index.json'
+CHUNK_FILE = 'depth_chunk_%05d.npy'
+
+
+class DepthArchiveWriter:
+    """Appends depth frames to fixed-size memory-mapped .npy chunks and keeps the index up to date."""
+    def __init__(self, output_dir, width, height, chunk_frames=1000, total_frames=None):
+        self.output_dir = output_dir
+        self.width = width
+        self.height = height
+        self.chunk_frames = max(1, chunk_frames)
+        self.remaining = total_frames
+        self.chunks = []
+        self.positions = []
+        self.chunk = None
+        self.chunk_used = 0
+
+    def append(self, svo_position, depth):
+        # Store one depth frame; float depth is cast to uint16 exactly like .astype(np.uint16)
+        if self.chunk is None or self.chunk_used == len(self.chunk):
+            self._next_chunk()
+        np.copyto(self.chunk[self.chunk_used], depth, casting='unsafe')
+        self.chunk_used += 1
+        self.chunks[-1]['frames'] = self.chunk_used
+        self.positions.append(int(svo_position))
+
+    @property
+    def bytes_written(self):
+        return len(self.positions) * self.width * self.height * 2
+
+    def _next_chunk(self):
+        self._close_chunk()
+        frames = self.chunk_frames
+        if self.remaining is not None:
+            # Size the last chunk to what is left to export
+            frames = max(1, min(frames, self.remaining))
+            self.remaining -= frames
+        name = CHUNK_FILE % len(self.chunks)
+        self.chunk = np.lib.format.open_memmap(os.path.join(self.output_dir, name), mode='w+',
+                                               dtype=np.uint16, shape=(frames, self.height, self.width))
+        self.chunk_used = 0
+        self.chunks.append({'file': name, 'frames': 0})
+
+    def _close_chunk(self):
+        if self.chunk is not None:
+            self.chunk.flush()
+            self.chunk = None
+            self.write_index()
+
+    def restore(self, frames):
+        # Continue an archive left by an interrupted export, keeping only its first `frames` frames.
+        # Returns False when the folder does not hold that many archived frames.
+        try:
+            with open(os.path.join(self.output_dir, INDEX_FILE)) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return frames == 0
+        if (index['height'], index['width']) != (self.height, self.width) or len(index['svo_positions']) < frames:
+            return False
+        self.chunks = []
+        left = frames
+        for c in index['chunks']:
+            if left <= 0:
+                break
+            self.chunks.append({'file': c['file'], 'frames': min(c['frames'], left)})
+            left -= self.chunks[-1]['frames']
+        self.positions = index['svo_positions'][:frames]
+        if self.chunks:
+            self.chunk = np.load(os.path.join(self.output_dir, self.chunks[-1]['file']), mmap_mode='r+')
+            self.chunk_used = self.chunks[-1]['frames']
+            if self.remaining is not None:
+                self.remaining -= len(self.chunk) - self.chunk_used
+        self.write_index()
+        return True
+
+    def flush(self):
+        # Make every appended frame durable, e.g. before recording a checkpoint
+        if self.chunk is not None:
+            self.chunk.flush()
+        self.write_index()
+
+    def write_index(self):
+        index = {'version': 1, 'dtype': 'uint16', 'unit': 'millimeter',
+                 'height': self.height, 'width': self.width,
+                 'chunks': self.chunks, 'svo_positions': self.positions}
+        tmp = os.path.join(self.output_dir, INDEX_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp, os.path.join(self.output_dir, INDEX_FILE))
+
+    def close(self):
+        self._close_chunk()
+        self.write_index()
+
+
+class DepthArchive:
+    """Read-only view of a depth archive.
+
+    archive[i] is the i-th exported frame, archive[a:b] a (frames, height, width) uint16 array.
+    Slices inside one chunk are memory-mapped views; slices across chunks are copied.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self.height = self.index['height']
+        self.width = self.index['width']
+        self.svo_positions = self.index['svo_positions']
+        self._chunk_files = [c['file'] for c in self.index['chunks']]
+        self._starts = np.cumsum([0] + [c['frames'] for c in self.index['chunks']])
+        self._maps = [None] * len(self._chunk_files)
+        self._by_position = None
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def _chunk(self, k):
+        if self._maps[k] is None:
+            self._maps[k] = np.load(os.path.join(self.path, self._chunk_files[k]), mmap_mode='r')
+        return self._maps[k]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return np.stack([self[i] for i in range(start, stop, step)]) if stop > start else \
+                    np.empty((0, self.height, self.width), np.uint16)
+            return self._range(start, stop)
+        i = int(item)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"frame {item} out of range for archive of {len(self)} frames")
+        k = int(np.searchsorted(self._starts, i, side='right')) - 1
+        return self._chunk(k)[i - self._starts[k]]
+
+    def _range(self, start, stop):
+        if stop <= start:
+            return np.empty((0, self.height, self.width), np.uint16)
+        first = int(np.searchsorted(self._starts, start, side='right')) - 1
+        last = int(np.searchsorted(self._starts, stop - 1, side='right')) - 1
+        if first == last:
+            base = self._starts[first]
+            return self._chunk(first)[start - base:stop - base]
+        parts = []
+        for k in range(first, last + 1):
+            base = self._starts[k]
+            parts.append(self._chunk(k)[max(start, base) - base:min(stop, self._starts[k + 1]) - base])
+        return np.concatenate(parts)
+
+    def frame(self, svo_position):
+        # Depth frame recorded at the given SVO frame number
+        if self._by_position is None:
+            self._by_position = {p: i for i, p in enumerate(self.svo_positions)}
+        return self[self._by_position[svo_position]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Print a summary of a depth archive written by svo_export.py')
+    parser.add_argument('archive', type=str, help='Folder holding depth_index.json and the depth chunks')
+    opt = parser.parse_args()
+
+    archive = DepthArchive(opt.archive)
+    print(f"{len(archive)} frames of {archive.width}x{archive.height} uint16 depth ({archive.index['unit']}) "
+          f"in {len(archive.index['chunks'])} chunk(s)")
+    if len(archive):
+        print(f"SVO frames {archive.svo_positions[0]} to {archive.svo_positions[-1]}")
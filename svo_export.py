@@ -21,11 +21,27 @@
 import sys
 import pyzed.sl as sl
 import numpy as np
-import cv2
 from pathlib import Path
 import enum
 import argparse
 import os 
+import json
+import shutil
+import time
+import subprocess
+import threading
+import queue
+import multiprocessing
+from svo_io import rgba_to_rgb, compose_sbs_rgb, ImageWriterPool, open_video_writer, join_videos, \
+    VIDEO_ENCODERS, DEFAULT_CODECS, parse_event
+from svo_depth import DepthArchiveWriter
+from svo_checkpoint import Checkpoint, input_signature, CHECKPOINT_SUFFIX, IMAGE_CHECKPOINT
+from svo_profile import StageProfiler, NULL_PROFILER, format_summary
+from svo_ranges import ranges_from_option, visit_plan
+
+PREFETCH_BYTES = 8 << 20   # read from the start and the end of an SVO by probe_svo()
+MAX_GRAB_GAP = 30          # larger gaps between exported frames are seeked over instead of grabbed through
+
 
 class AppType(enum.Enum):
     LEFT_AND_RIGHT = 1
@@ -41,7 +57,150 @@ def progress_bar(percent_done, bar_length=50):
     sys.stdout.flush()
 
 
+class ProgressReporter:
+    """Reports export progress as the classic text progress bar or as JSON lines (--progress json).
+
+    In JSON mode every line on stdout is one object with an "event" key:
+      start     start_frame, end_frame, total_frames, output
+      progress  frames_done, total_frames, percent, fps, bytes_written, eta_s (at most every `interval` s)
+      warning   message
+      error     message
+      profile   summary (with --profile: per-stage latencies, fps timeline and peak RSS, see svo_profile.py)
+      done      status ("ok", "error" or "cancelled"), frames_done, total_frames, elapsed_s, fps, bytes_written
+
+    With `on_event`, the same events are passed to that callback as dicts instead of being printed.
+    """
+    def __init__(self, style='bar', on_event=None, interval=0.5):
+        self.on_event = on_event
+        self.json = style == 'json' or on_event is not None
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.total = 0
+        self.frames_done = 0
+        self.bytes_written = lambda: 0
+        self.start_time = self.last_time = time.time()
+        self.last_frames = 0
+        self.fps = 0.0
+
+    def _emit(self, event):
+        with self.lock:
+            if self.on_event:
+                self.on_event(event)
+                return
+            sys.stdout.write(json.dumps(event) + "\n")
+            sys.stdout.flush()
+
+    def _text(self, text):
+        with self.lock:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    def start(self, start_frame, end_frame, output, bytes_written=None, segments=1, total=None):
+        self.total = end_frame - start_frame if total is None else total
+        self.start_time = self.last_time = time.time()
+        if bytes_written:
+            self.bytes_written = bytes_written
+        if self.json:
+            self._emit({'event': 'start', 'start_frame': start_frame, 'end_frame': end_frame,
+                        'total_frames': self.total, 'output': output})
+        elif segments > 1:
+            self._text(f"Converting SVO from frame {start_frame} to {end_frame} in {segments} segments... "
+                       "Use Ctrl-C to interrupt.\n")
+        else:
+            self._text(f"Converting SVO from frame {start_frame} to {end_frame}... Use Ctrl-C to interrupt.\n")
+
+    def update(self, frames_done):
+        self.frames_done = frames_done
+        if not self.json:
+            progress_bar(frames_done / self.total * 100, 30)
+            return
+        now = time.time()
+        if frames_done < self.total and now - self.last_time < self.interval:
+            return
+        if frames_done == self.last_frames:
+            return
+        self._emit(self._progress_event(now))
+
+    def _progress_event(self, now):
+        # Recent frame rate (smoothed over the reporting intervals) and ETA from the average rate
+        dt = now - self.last_time
+        if dt > 0:
+            recent = (self.frames_done - self.last_frames) / dt
+            self.fps = recent if self.last_frames == 0 else 0.5 * recent + 0.5 * self.fps
+        self.last_time, self.last_frames = now, self.frames_done
+        elapsed = now - self.start_time
+        average = self.frames_done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.frames_done
+        return {'event': 'progress', 'frames_done': self.frames_done, 'total_frames': self.total,
+                'percent': round(self.frames_done / self.total * 100, 2) if self.total else 100.0,
+                'fps': round(self.fps, 2), 'bytes_written': self.bytes_written(),
+                'eta_s': round(remaining / average, 1) if average > 0 else None}
+
+    def warning(self, message):
+        if self.json:
+            self._emit({'event': 'warning', 'message': message})
+        else:
+            self._text(f"\n{message}\n")
+
+    def error(self, message):
+        if self.json:
+            self._emit({'event': 'error', 'message': message})
+        else:
+            self._text(f"\n{message}\n")
+
+    def profile(self, summary):
+        if self.json:
+            self._emit({'event': 'profile', 'summary': summary})
+        else:
+            self._text("\n" + format_summary(summary) + "\n")
+
+    def finish(self, ok=True, cancelled=False):
+        if not self.json:
+            if cancelled:
+                self._text("\nConversion cancelled.\n")
+            elif ok:
+                self._text("\nConversion finished.\n")
+            return 0 if ok else 1
+        elapsed = time.time() - self.start_time
+        status = 'cancelled' if cancelled else ('ok' if ok else 'error')
+        self._emit({'event': 'done', 'status': status, 'frames_done': self.frames_done,
+                    'total_frames': self.total, 'elapsed_s': round(elapsed, 3),
+                    'fps': round(self.frames_done / elapsed, 2) if elapsed > 0 else 0.0,
+                    'bytes_written': self.bytes_written()})
+        return 0 if ok else 1
+
+
 def main(opt):
+    # Command-line entry point: progress goes to stdout in the style selected with --progress
+    return convert(opt)
+
+
+def convert(opt, on_event=None, cancel=None):
+    """Export an SVO file in-process and return 0 on success, 1 otherwise.
+
+    `opt` holds the command-line options (see make_options()). Progress, warnings and errors are passed
+    to `on_event` as the dicts documented in ProgressReporter; without it they are printed like the
+    command line does. `cancel` is an optional threading/multiprocessing Event: once set, the export
+    stops after the frame in progress and reports a "cancelled" done event.
+    """
+    report = ProgressReporter(opt.progress, on_event)
+    err = validate_options(opt)
+    if err:
+        report.error(err)
+        return report.finish(False)
+
+    # The camera is closed whatever happens, also when the export raises: ExportWorker processes run many jobs
+    zed = sl.Camera()
+    try:
+        return _convert(opt, report, zed, cancel)
+    except Exception as e:
+        report.error(f"Error: {e}")
+        return report.finish(False)
+    finally:
+        zed.close()
+
+
+def _convert(opt, report, zed, cancel):
     # Get input parameters
     svo_input_path = opt.input_svo_file
     output_dir = opt.output_path_dir
@@ -58,9 +217,8 @@ def main(opt):
         output_as_video = False
 
     if not output_as_video and not os.path.isdir(output_dir):
-        sys.stdout.write("Input directory doesn't exist. Check permissions or create it.\n",
-                         output_dir, "\n")
-        exit()
+        report.error("Error: output directory doesn't exist. Check permissions or create it: " + output_dir)
+        return report.finish(False)
 
     # Specify SVO path parameter
     init_params = sl.InitParameters()
@@ -68,43 +226,44 @@ def main(opt):
     init_params.svo_real_time_mode = False  # Don't convert in realtime
     init_params.coordinate_units = sl.UNIT.MILLIMETER  # Use milliliter units (for depth measurements)
 
-    # Create ZED objects
-    zed = sl.Camera()
-
     # Open the SVO file specified as a parameter
     err = zed.open(init_params)
     if err != sl.ERROR_CODE.SUCCESS:
-        sys.stdout.write(repr(err))
-        zed.close()
-        exit()
+        report.error(f"Error opening {svo_input_path}: {err!r}")
+        return report.finish(False)
     
     # Get image size
     image_size = zed.get_camera_information().camera_configuration.resolution
     width = image_size.width
     height = image_size.height
+    # With --scale the SDK retrieves every image directly at the reduced size (kept even for the encoders)
+    resolution = None
+    if opt.scale != 1:
+        width = max(2, int(round(width * opt.scale / 2)) * 2)
+        height = max(2, int(round(height * opt.scale / 2)) * 2)
+        resolution = sl.Resolution(width, height)
     width_sbs = width * 2
+    # Left and right come from one SIDE_BY_SIDE retrieve for full-size LEFT+RIGHT videos
+    sbs_retrieve = output_as_video and app_type == AppType.LEFT_AND_RIGHT and resolution is None
     
-    # Prepare side by side image container equivalent to CV_8UC4
-    svo_image_sbs_rgba = np.zeros((height, width_sbs, 4), dtype=np.uint8)
+    # Prepare single image containers (left, right, depth). Every frame in flight between the pipeline
+    # stages owns one set, so the pool size bounds the memory used by the queues. Image sequences also
+    # keep a set per frame that the PNG writers are still encoding.
+    pool_size = max(opt.queue_depth, 0) + 2
+    mat_pool = queue.Queue()
+    for _ in range(pool_size + (0 if output_as_video else max(opt.writers, 0))):
+        mat_pool.put((sl.Mat(), sl.Mat(), sl.Mat()))
 
-    # Prepare single image containers
-    left_image = sl.Mat()
-    right_image = sl.Mat()
-    depth_image = sl.Mat()
-
-    video_writer = None
+    # Prepare side by side RGB frames for the video. They are allocated once and reused for the whole
+    # run: the compose stage converts into a free frame and the writer hands it back once encoded.
+    rgb_pool = queue.Queue()
     if output_as_video:
-        # Create video writer with MPEG-4 part 2 codec
-        video_writer = cv2.VideoWriter(avi_output_path,
-                                       cv2.VideoWriter_fourcc('M', '4', 'S', '2'),
-                                       max(zed.get_camera_information().camera_configuration.fps, 25),
-                                       (width_sbs, height))
-        if not video_writer.isOpened():
-            sys.stdout.write("OpenCV video writer cannot be opened. Please check the .avi file path and write "
-                             "permissions.\n")
-            zed.close()
-            exit()
-    
+        for _ in range(pool_size):
+            rgb_pool.put(np.empty((height, width_sbs, 3), dtype=np.uint8))
+
+    # Output frame rate: the camera rate, at least 25, unless set explicitly
+    fps = opt.fps if opt.fps > 0 else max(zed.get_camera_information().camera_configuration.fps, 25)
+
     rt_param = sl.RuntimeParameters()
 
     # --- MODIFIED: Start SVO conversion to AVI/SEQUENCE with trimming ---
@@ -112,90 +271,729 @@ def main(opt):
     
     # Validate start frame
     if not (0 <= opt.start_frame < nb_frames):
-        print(f"\nError: --start_frame ({opt.start_frame}) is out of SVO bounds (0-{nb_frames-1}).")
-        zed.close()
-        exit()
+        report.error(f"Error: --start_frame ({opt.start_frame}) is out of SVO bounds (0-{nb_frames-1}).")
+        return report.finish(False)
 
     # Determine the end frame for the loop
     end_frame = min(opt.end_frame, nb_frames) if opt.end_frame != -1 else nb_frames
     
     # Validate end frame
     if end_frame <= opt.start_frame:
-        print(f"\nError: --end_frame ({end_frame}) must be greater than --start_frame ({opt.start_frame}).")
+        report.error(f"Error: --end_frame ({end_frame}) must be greater than --start_frame ({opt.start_frame}).")
+        return report.finish(False)
+
+    # Multi-range mode: one pass over the SVO writes an output per range
+    if opt.ranges:
+        return export_ranges(opt, report, zed, app_type, (width, height), resolution, fps, cancel)
+
+    # Segment-parallel mode: every chunk is converted by its own process, then joined
+    if output_as_video and opt.segments > 1:
+        if opt.profile:
+            report.warning("--profile is not available with --segments, the export is not profiled.")
         zed.close()
-        exit()
+        return export_segments(opt, report, opt.start_frame, end_frame, fps, (width_sbs, height), cancel)
+
+    stride = max(1, opt.stride)
+
+    # With --resume, continue from the checkpoint of an interrupted run with the same parameters
+    start_frame = opt.start_frame
+    checkpoint = None
+    if opt.resume:
+        checkpoint = _load_checkpoint(opt, report, output_as_video, end_frame, fps)
+        start_frame = checkpoint.next_frame
+        if start_frame > opt.start_frame:
+            report.warning(f"Resuming from frame {start_frame} ({checkpoint.frames_done} frames already exported).")
+
+    video_writer = None
+    segment_path = avi_output_path
+    segment_frames = 0
+    if output_as_video:
+        if checkpoint:
+            # Resumable AVI exports write numbered segments that are joined at the end
+            segment_path = _segment_path(avi_output_path, len(checkpoint.segments))
+        # Create video writer with the selected backend and codec (MPEG-4 part 2 by default)
+        video_writer = _open_writer(opt, segment_path, fps, (width_sbs, height))
+        if not video_writer.isOpened():
+            report.error(f"Error: video writer ({opt.encoder}, {opt.codec or DEFAULT_CODECS[opt.encoder]}) cannot be "
+                         "opened. Please check that the codec is available, the .avi file path and write permissions.")
+            return report.finish(False)
     
     # Set the SVO position to the desired start frame
-    zed.set_svo_position(opt.start_frame)
-    
-    sys.stdout.write(f"Converting SVO from frame {opt.start_frame} to {end_frame}... Use Ctrl-C to interrupt.\n")
+    zed.set_svo_position(start_frame)
 
-    frames_to_process = end_frame - opt.start_frame
+    frames_to_process = len(range(start_frame, end_frame, stride))
     frames_processed = 0
+    abort = threading.Event()
+    # Opt-in per-stage timing (--profile); the null profiler records nothing
+    prof = StageProfiler() if opt.profile else NULL_PROFILER
+    image_writer = None
 
-    while frames_processed < frames_to_process:
-        err = zed.grab(rt_param)
-        if err == sl.ERROR_CODE.SUCCESS:
-            svo_position = zed.get_svo_position()
+    def bytes_written():
+        if output_as_video:
+            return os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+        archived = depth_archive.bytes_written if depth_archive else 0
+        return (image_writer.bytes_written if image_writer else 0) + archived
 
-            # Retrieve SVO images
-            zed.retrieve_image(left_image, sl.VIEW.LEFT)
-
-            if app_type == AppType.LEFT_AND_RIGHT:
-                zed.retrieve_image(right_image, sl.VIEW.RIGHT)
-            elif app_type == AppType.LEFT_AND_DEPTH:
-                zed.retrieve_image(right_image, sl.VIEW.DEPTH)
-            elif app_type == AppType.LEFT_AND_DEPTH_16:
-                zed.retrieve_measure(depth_image, sl.MEASURE.DEPTH)
-
-            if output_as_video:
-                # Copy the left image to the left side of SBS image
-                svo_image_sbs_rgba[0:height, 0:width, :] = left_image.get_data()
-
-                # Copy the right image to the right side of SBS image
-                svo_image_sbs_rgba[0:, width:, :] = right_image.get_data()
-
-                # Convert SVO image from RGBA to RGB
-                ocv_image_sbs_rgb = cv2.cvtColor(svo_image_sbs_rgba, cv2.COLOR_RGBA2RGB)
-
-                # Write the RGB image in the video
-                video_writer.write(ocv_image_sbs_rgb)
-            else:
-                # Generate file names
-                filename1 = output_dir +"/"+ ("left%s.png" % str(svo_position).zfill(6))
-                filename2 = output_dir +"/"+ (("right%s.png" if app_type == AppType.LEFT_AND_RIGHT
-                                             else "depth%s.png") % str(svo_position).zfill(6))
-                # Save Left images
-                cv2.imwrite(str(filename1), left_image.get_data())
-
-                if app_type != AppType.LEFT_AND_DEPTH_16:
-                    # Save right images
-                    cv2.imwrite(str(filename2), right_image.get_data())
+    report.start(start_frame, end_frame, avi_output_path if output_as_video else output_dir, bytes_written,
+                 total=frames_to_process)
+    depth_archive = None
+    if app_type == AppType.LEFT_AND_DEPTH_16 and opt.depth_format == 'npy':
+        # Depth frames are appended to memory-mapped chunks instead of one PNG each
+        depth_archive = DepthArchiveWriter(output_dir, width, height, opt.depth_chunk_frames, frames_to_process)
+        if checkpoint and not depth_archive.restore(checkpoint.frames_done):
+            report.error(f"Error: the depth archive in {output_dir} does not match its checkpoint. Delete "
+                         f"{checkpoint.path} to export again from frame {opt.start_frame}.")
+            return report.finish(False)
+    # The PNG writer threads start last, nothing can fail between them and the pipeline below
+    image_writer = None if output_as_video else ImageWriterPool(opt.writers, profiler=prof)
+
+    # Images are written out of order by the writer pool: the checkpoint only moves past frames whose
+    # files are all complete (frames are numbered in export order)
+    images_done = set()
+    images_frontier = 0
+    images_lock = threading.Lock()
+
+    def image_frame_done(seq):
+        nonlocal images_frontier
+        with images_lock:
+            images_done.add(seq)
+            while images_frontier in images_done:
+                images_done.discard(images_frontier)
+                images_frontier += 1
+
+    def save_checkpoint(frames_done):
+        # Record frames_done frames of this run as exported
+        if image_writer and image_writer.failed:
+            return
+        if depth_archive:
+            depth_archive.flush()
+        checkpoint.next_frame = start_frame + frames_done * stride
+        checkpoint.frames_done = base_frames_done + frames_done
+        checkpoint.save()
+
+    def next_segment():
+        # Close the current AVI segment and record it in the checkpoint
+        nonlocal video_writer, segment_path, segment_frames
+        error = video_writer.release()
+        video_writer = None
+        if error:
+            raise IOError(error)
+        if segment_frames:
+            checkpoint.segments.append({'file': segment_path, 'frames': segment_frames})
+            save_checkpoint(frames_processed)
+        else:
+            os.remove(segment_path)
+        segment_path = _segment_path(avi_output_path, len(checkpoint.segments))
+        segment_frames = 0
+
+    base_frames_done = checkpoint.frames_done if checkpoint else 0
+    last_saved = 0
+
+    def compose(item):
+        svo_position, mats = item
+        left_image, right_image, depth_image = mats
+        if output_as_video:
+            ocv_image_sbs_rgb = _pool_get(rgb_pool, abort)
+            with prof.time('compose'):
+                if sbs_retrieve:
+                    # The SDK already composed the SBS image, only convert it from RGBA to RGB
+                    rgba_to_rgb(left_image.get_data(), ocv_image_sbs_rgb)
                 else:
-                    # Save depth images (convert to uint16)
-                    cv2.imwrite(str(filename2), depth_image.get_data().astype(np.uint16))
+                    # Convert left and depth view from RGBA to RGB, each into its half of the SBS image
+                    compose_sbs_rgb(left_image.get_data(), right_image.get_data(), ocv_image_sbs_rgb)
+            mat_pool.put(mats)
+            return svo_position, ocv_image_sbs_rgb, None
+
+        if app_type == AppType.LEFT_AND_DEPTH_16 and not depth_archive:
+            # Convert depth images to uint16
+            with prof.time('depth_u16'):
+                return svo_position, mats, depth_image.get_data().astype(np.uint16)
+        return svo_position, mats, None
+
+    def write(item):
+        nonlocal frames_processed, video_writer, segment_frames, last_saved
+        svo_position, frame, depth_u16 = item
+        if output_as_video:
+            if video_writer is None:
+                video_writer = _open_writer(opt, segment_path, fps, (width_sbs, height))
+                if not video_writer.isOpened():
+                    raise IOError(f"video writer cannot be opened for {segment_path}")
+            # Write the RGB image in the video
+            with prof.time('encode'):
+                video_writer.write(frame)
+            rgb_pool.put(frame)
+            segment_frames += 1
+        else:
+            left_image, right_image, depth_image = frame
+            # Generate file names
+            filename1 = output_dir +"/"+ ("left%s.png" % str(svo_position).zfill(6))
+            filename2 = output_dir +"/"+ (("right%s.png" if app_type == AppType.LEFT_AND_RIGHT
+                                         else "depth%s.png") % str(svo_position).zfill(6))
+            if depth_archive:
+                # Save depth into the archive (converted to uint16 while copying)
+                with prof.time('archive'):
+                    depth_archive.append(svo_position, depth_image.get_data())
+
+            # The containers go back to the pool once both images are written
+            pending = [1 if depth_archive else 2]
+            pending_lock = threading.Lock()
+            seq = frames_processed
+            def release():
+                with pending_lock:
+                    pending[0] -= 1
+                    if pending[0] == 0:
+                        mat_pool.put(frame)
+                        if checkpoint:
+                            image_frame_done(seq)
+
+            # Save Left images
+            image_writer.submit(str(filename1), left_image.get_data(), release)
+
+            if app_type != AppType.LEFT_AND_DEPTH_16:
+                # Save right images
+                image_writer.submit(str(filename2), right_image.get_data(), release)
+            elif not depth_archive:
+                # Save depth images
+                image_writer.submit(str(filename2), depth_u16, release)
+            _report_write_failures(report, image_writer)
+
+        # Display progress based on the trimmed segment
+        frames_processed += 1
+        prof.frame()
+        report.update(frames_processed)
+
+        if checkpoint and opt.checkpoint_frames > 0:
+            if output_as_video and segment_frames >= opt.checkpoint_frames:
+                next_segment()
+            elif not output_as_video and images_frontier - last_saved >= opt.checkpoint_frames:
+                last_saved = images_frontier
+                save_checkpoint(last_saved)
+
+    frames = grab_frames(zed, rt_param, app_type, sbs_retrieve, mat_pool, frames_to_process, abort, report,
+                         cancel, start_frame, stride, resolution, prof)
+
+    def finish(ok=True, cancelled=False):
+        if prof.enabled:
+            _report_profile(opt, report, prof.summary())
+        return report.finish(ok, cancelled)
+
+    # A failing stage (writer, encoder, disk) ends the export with an error instead of escaping convert(),
+    # and the camera and writers are closed whatever happens: ExportWorker processes run many jobs
+    errors = []
+    try:
+        run_pipeline(frames, [compose, write], opt.queue_depth, abort)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        if image_writer:
+            # Wait for the PNG writers to finish
+            image_writer.close()
+        if depth_archive:
+            depth_archive.close()
+        try:
+            if checkpoint and image_writer:
+                save_checkpoint(images_frontier)
+            elif checkpoint and video_writer:
+                next_segment()
+            elif video_writer:
+                # Close the video writer
+                write_error = video_writer.release()
+                if write_error:
+                    errors.append(write_error)
+        except Exception as e:
+            errors.append(e)
+
+    for error in errors:
+        report.error(f"Error: {error}")
+    if errors:
+        return finish(False)
+    if image_writer:
+        _report_write_failures(report, image_writer)
+        if image_writer.failed:
+            report.error(f"Error: {image_writer.failed} image(s) could not be written.")
+            return finish(False)
+    if cancel is not None and cancel.is_set():
+        return finish(False, cancelled=True)
+    if checkpoint and output_as_video:
+        # Join the segments of every run into the requested AVI
+        parts = [seg['file'] for seg in checkpoint.segments]
+        if len(parts) == 1:
+            os.replace(parts[0], avi_output_path)
+        else:
+            with prof.time('join'):
+                joined = join_videos(parts, avi_output_path, lambda path: _open_writer(opt, path, fps, (width_sbs, height)),
+                                     warn=report.warning)
+            if not joined:
+                report.error(f"Error: the segments could not be joined into {avi_output_path}. Check the .avi file "
+                             "path and write permissions.")
+                return finish(False)
+            for part in parts:
+                os.remove(part)
+        segment_path = avi_output_path
+    if checkpoint:
+        checkpoint.remove()
+    return finish()
+
+
+def _report_profile(opt, report, summary):
+    report.profile(summary)
+    if opt.profile_file:
+        with open(opt.profile_file, 'w') as f:
+            json.dump(summary, f, indent=1)
+
+
+def _segment_path(avi_path, k):
+    base, ext = os.path.splitext(avi_path)
+    return f"{base}.seg{k:03d}{ext}"
+
+
+def _load_checkpoint(opt, report, output_as_video, end_frame, fps):
+    # Checkpoint of a previous run with the same parameters, or a fresh one starting at --start_frame
+    params = {'mode': opt.mode, 'input': input_signature(opt.input_svo_file),
+              'start_frame': opt.start_frame, 'end_frame': end_frame, 'stride': opt.stride, 'scale': opt.scale}
+    if output_as_video:
+        path = opt.output_avi_file + CHECKPOINT_SUFFIX
+        params.update(encoder=opt.encoder, codec=opt.codec or DEFAULT_CODECS[opt.encoder], fps=fps,
+                      segments=opt.segments)
+        if opt.encoder == 'ffmpeg':
+            params.update(preset=opt.preset, crf=opt.crf)
+    else:
+        path = os.path.join(opt.output_path_dir, IMAGE_CHECKPOINT)
+        if opt.mode == 4:
+            params.update(depth_format=opt.depth_format)
+            if opt.depth_format == 'npy':
+                params.update(depth_chunk_frames=opt.depth_chunk_frames)
+
+    checkpoint = Checkpoint(path, params, opt.start_frame)
+    if not checkpoint.load() and os.path.exists(path):
+        report.warning(f"Ignoring checkpoint {path}: it does not match this export, starting from frame "
+                       f"{opt.start_frame}.")
+        for seg in checkpoint.stale_segments:
+            if os.path.isfile(seg['file']):
+                os.remove(seg['file'])
+    return checkpoint
 
-            # Display progress based on the trimmed segment
-            frames_processed += 1
-            progress_bar(frames_processed / frames_to_process * 100, 30)
+
+def _report_write_failures(report, image_writer):
+    for path, err in image_writer.pop_failures():
+        report.error(f"Error writing {path}: {err}")
+
+
+def grab_frames(zed, rt_param, app_type, sbs, mat_pool, frames_to_process, abort, report, cancel=None,
+                start_frame=0, stride=1, resolution=None, prof=NULL_PROFILER, positions=None):
+    # Producer stage: grab and retrieve frames into containers taken from mat_pool. With `sbs`, left and
+    # right come from a single SIDE_BY_SIDE retrieve into the first container. Skipped frames (stride,
+    # gaps between ranges) are grabbed through without depth or retrieve, and the SVO is only
+    # repositioned over gaps larger than MAX_GRAB_GAP: a seek decodes again from the previous keyframe.
+    # A resolution makes the SDK retrieve scaled images.
+    # `positions` (ascending, the SVO set to the first one) replaces start_frame/stride/frames_to_process.
+    if positions is None:
+        positions = range(start_frame, start_frame + frames_to_process * stride, stride)
+    frames_grabbed = 0
+    skip_param = sl.RuntimeParameters()
+    skip_param.enable_depth = False
+    retrieve_args = () if resolution is None else (sl.MEM.CPU, resolution)
+    while frames_grabbed < len(positions):
+        if cancel is not None and cancel.is_set():
+            return
+        mats = _pool_get(mat_pool, abort)
+        if mats is None:
+            return
+        left_image, right_image, depth_image = mats
+        gap = positions[frames_grabbed] - positions[frames_grabbed - 1] - 1 if frames_grabbed else 0
+        if 0 < gap <= MAX_GRAB_GAP:
+            with prof.time('skip'):
+                for _ in range(gap):
+                    if zed.grab(skip_param) != sl.ERROR_CODE.SUCCESS:
+                        # Seek to the frame and let the grab below report the error
+                        zed.set_svo_position(positions[frames_grabbed])
+                        break
+        elif gap:
+            with prof.time('seek'):
+                zed.set_svo_position(positions[frames_grabbed])
+        with prof.time('grab'):
+            err = zed.grab(rt_param)
+        if err == sl.ERROR_CODE.SUCCESS:
+            # Retrieve SVO images
+            with prof.time('retrieve'):
+                if sbs:
+                    zed.retrieve_image(left_image, sl.VIEW.SIDE_BY_SIDE)
+                elif app_type == AppType.LEFT_AND_RIGHT:
+                    zed.retrieve_image(left_image, sl.VIEW.LEFT, *retrieve_args)
+                    zed.retrieve_image(right_image, sl.VIEW.RIGHT, *retrieve_args)
+                elif app_type == AppType.LEFT_AND_DEPTH:
+                    zed.retrieve_image(left_image, sl.VIEW.LEFT, *retrieve_args)
+                    zed.retrieve_image(right_image, sl.VIEW.DEPTH, *retrieve_args)
+                elif app_type == AppType.LEFT_AND_DEPTH_16:
+                    zed.retrieve_image(left_image, sl.VIEW.LEFT, *retrieve_args)
+                    zed.retrieve_measure(depth_image, sl.MEASURE.DEPTH, *retrieve_args)
+
+            frames_grabbed += 1
+            yield zed.get_svo_position(), mats
 
         elif err == sl.ERROR_CODE.END_OF_SVOFILE_REACHED:
-            sys.stdout.write("\nSVO end has been reached unexpectedly. Exiting.\n")
-            break
+            report.warning("SVO end has been reached unexpectedly. Exiting.")
+            return
         else:
-            sys.stdout.write(f"\nError grabbing frame: {err}. Exiting.\n")
-            break
+            report.error(f"Error grabbing frame: {err}. Exiting.")
+            return
+
+
+_END = object()
+
+
+def _pool_get(q, abort):
+    # Blocking get that gives up once another pipeline stage has failed
+    while not abort.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return None
+
+
+def _pool_put(q, item, abort):
+    while not abort.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def run_pipeline(source, stages, queue_depth, abort):
+    # Push every item of `source` through `stages` in order. With queue_depth > 0 the source and every
+    # stage but the last run on their own thread, linked by queues of that depth (backpressure), and
+    # the last stage runs on the calling thread. Otherwise everything runs inline, one frame at a time.
+    if queue_depth <= 0:
+        for item in source:
+            for stage in stages:
+                item = stage(item)
+        return
+
+    queues = [queue.Queue(maxsize=queue_depth) for _ in stages]
+    errors = []
+
+    def feed():
+        try:
+            for item in source:
+                if not _pool_put(queues[0], item, abort):
+                    return
+        except BaseException as e:
+            errors.append(e)
+            abort.set()
+        finally:
+            _pool_put(queues[0], _END, abort)
+
+    def run_stage(stage, q_in, q_out):
+        try:
+            while True:
+                item = _pool_get(q_in, abort)
+                if item is None:
+                    return
+                if item is _END:
+                    break
+                if not _pool_put(q_out, stage(item), abort):
+                    return
+        except BaseException as e:
+            errors.append(e)
+            abort.set()
+        finally:
+            _pool_put(q_out, _END, abort)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    for k, stage in enumerate(stages[:-1]):
+        threads.append(threading.Thread(target=run_stage, args=(stage, queues[k], queues[k + 1]), daemon=True))
+    for t in threads:
+        t.start()
+
+    try:
+        while True:
+            item = _pool_get(queues[-1], abort)
+            if item is None or item is _END:
+                break
+            stages[-1](item)
+    finally:
+        abort.set()
+        for t in threads:
+            t.join()
+    if errors:
+        raise errors[0]
 
+
+def range_output(opt, frame_range):
+    # Output of one range: "<avi>_<name>.avi" in AVI modes, the folder "<output_path_dir>/<name>" otherwise
+    if opt.mode < 2:
+        base, ext = os.path.splitext(opt.output_avi_file)
+        return f"{base}_{frame_range.name}{ext}"
+    return os.path.join(opt.output_path_dir, frame_range.name)
+
+
+def export_ranges(opt, report, zed, app_type, size, resolution, fps, cancel=None):
+    # Export every range of --ranges in one pass: the frames of all ranges are decoded once, in ascending
+    # order, seeking only over gaps larger than MAX_GRAB_GAP. Frames shared by overlapping ranges are
+    # grabbed and composed once and written to each of their outputs. The caller closes the camera.
+    output_as_video = opt.mode < 2
+    width, height = size
+    nb_frames = zed.get_svo_number_of_frames()
+    stride = max(1, opt.stride)
+    ranges = ranges_from_option(opt.ranges)
+    for r in ranges:
+        if r.start >= nb_frames:
+            report.error(f"Error: range {r.start}-{r.end} starts after the end of the SVO (0-{nb_frames-1}).")
+            return report.finish(False)
+        r.end = min(r.end, nb_frames)
+    frame_lists = [r.frames(stride) for r in ranges]
+    plan = visit_plan(frame_lists)
+    positions = [n for n, _ in plan]
+    owners = dict(plan)
+    last_frames = {k: frames[-1] for k, frames in enumerate(frame_lists)}
+    outputs = [range_output(opt, r) for r in ranges]
+
+    sbs_retrieve = output_as_video and app_type == AppType.LEFT_AND_RIGHT and resolution is None
+    pool_size = max(opt.queue_depth, 0) + 2
+    mat_pool = queue.Queue()
+    for _ in range(pool_size + (0 if output_as_video else max(opt.writers, 0))):
+        mat_pool.put((sl.Mat(), sl.Mat(), sl.Mat()))
+    rgb_pool = queue.Queue()
     if output_as_video:
-        # Close the video writer
-        video_writer.release()
+        for _ in range(pool_size):
+            rgb_pool.put(np.empty((height, width * 2, 3), dtype=np.uint8))
 
-    zed.close()
-    print("\nConversion finished.")
-    return 0
+    prof = StageProfiler() if opt.profile else NULL_PROFILER
+    image_writer = None if output_as_video else ImageWriterPool(opt.writers, profiler=prof)
+    depth_archives = {}
+    video_writers = {}
+    frames_processed = 0
+    abort = threading.Event()
 
+    def bytes_written():
+        if output_as_video:
+            return sum(os.path.getsize(path) for path in outputs if os.path.exists(path))
+        return image_writer.bytes_written + sum(a.bytes_written for a in depth_archives.values())
 
-if __name__ == "__main__":
+    report.start(positions[0], positions[-1] + 1, opt.output_avi_file if output_as_video else opt.output_path_dir,
+                 bytes_written, total=len(positions))
+
+    def compose(item):
+        svo_position, mats = item
+        left_image, right_image, depth_image = mats
+        if output_as_video:
+            ocv_image_sbs_rgb = _pool_get(rgb_pool, abort)
+            with prof.time('compose'):
+                if sbs_retrieve:
+                    rgba_to_rgb(left_image.get_data(), ocv_image_sbs_rgb)
+                else:
+                    compose_sbs_rgb(left_image.get_data(), right_image.get_data(), ocv_image_sbs_rgb)
+            mat_pool.put(mats)
+            return svo_position, ocv_image_sbs_rgb, None
+        if app_type == AppType.LEFT_AND_DEPTH_16 and not depth_archives:
+            with prof.time('depth_u16'):
+                return svo_position, mats, depth_image.get_data().astype(np.uint16)
+        return svo_position, mats, None
+
+    def write(item):
+        nonlocal frames_processed
+        svo_position, frame, depth_u16 = item
+        targets = owners.get(svo_position, [])
+        if output_as_video:
+            for k in targets:
+                writer = video_writers.get(k)
+                if writer is None:
+                    writer = video_writers[k] = _open_writer(opt, outputs[k], fps, (width * 2, height))
+                    if not writer.isOpened():
+                        raise IOError(f"video writer cannot be opened for {outputs[k]}")
+                with prof.time('encode'):
+                    writer.write(frame)
+                if svo_position == last_frames[k]:
+                    # The range is complete, close its file right away
+                    error = video_writers.pop(k).release()
+                    if error:
+                        raise IOError(error)
+            rgb_pool.put(frame)
+        else:
+            left_image, right_image, depth_image = frame
+            second = "right%s.png" if app_type == AppType.LEFT_AND_RIGHT else "depth%s.png"
+            images = [left_image.get_data()]
+            if app_type != AppType.LEFT_AND_DEPTH_16:
+                images.append(right_image.get_data())
+            elif not depth_archives:
+                images.append(depth_u16)
+            # The containers go back to the pool once every file of every range is written
+            pending = [len(targets) * len(images)]
+            pending_lock = threading.Lock()
+            def release():
+                with pending_lock:
+                    pending[0] -= 1
+                    if pending[0] == 0:
+                        mat_pool.put(frame)
+            if not pending[0]:
+                mat_pool.put(frame)
+            for k in targets:
+                if k in depth_archives:
+                    with prof.time('archive'):
+                        depth_archives[k].append(svo_position, depth_image.get_data())
+                names = ["left%s.png" % str(svo_position).zfill(6), second % str(svo_position).zfill(6)]
+                for name, image in zip(names, images):
+                    image_writer.submit(os.path.join(outputs[k], name), image, release)
+            _report_write_failures(report, image_writer)
+
+        frames_processed += 1
+        prof.frame()
+        report.update(frames_processed)
+
+    zed.set_svo_position(positions[0])
+    frames = grab_frames(zed, sl.RuntimeParameters(), app_type, sbs_retrieve, mat_pool, len(positions), abort,
+                         report, cancel, resolution=resolution, prof=prof, positions=positions)
+    write_errors = []
+    try:
+        # The output folders are created here, so that a failure still closes the writers
+        if not output_as_video:
+            for k, path in enumerate(outputs):
+                os.makedirs(path, exist_ok=True)
+                if app_type == AppType.LEFT_AND_DEPTH_16 and opt.depth_format == 'npy':
+                    depth_archives[k] = DepthArchiveWriter(path, width, height, opt.depth_chunk_frames,
+                                                           len(frame_lists[k]))
+        run_pipeline(frames, [compose, write], opt.queue_depth, abort)
+    except Exception as e:
+        write_errors.append(e)
+    finally:
+        write_errors += [error for error in (writer.release() for writer in video_writers.values()) if error]
+        if image_writer:
+            image_writer.close()
+        for archive in depth_archives.values():
+            archive.close()
+
+    if prof.enabled:
+        _report_profile(opt, report, prof.summary())
+    for error in write_errors:
+        report.error(f"Error: {error}")
+    if write_errors:
+        return report.finish(False)
+    if image_writer:
+        _report_write_failures(report, image_writer)
+        if image_writer.failed:
+            report.error(f"Error: {image_writer.failed} image(s) could not be written.")
+            return report.finish(False)
+    if cancel is not None and cancel.is_set():
+        return report.finish(False, cancelled=True)
+    return report.finish()
+
+
+def split_range(start_frame, end_frame, segments, stride=1):
+    # Split [start_frame, end_frame) into at most `segments` contiguous, non-empty chunks. Chunks start
+    # on the stride grid, so together they export exactly the frames of the whole range.
+    total = len(range(start_frame, end_frame, stride))
+    segments = max(1, min(segments, total))
+    bounds = [start_frame + ((total * k) // segments) * stride for k in range(segments)] + [end_frame]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def export_segments(opt, report, start_frame, end_frame, fps, frame_size, cancel=None):
+    stride = max(1, opt.stride)
+    chunks = split_range(start_frame, end_frame, opt.segments, stride)
+    base, ext = os.path.splitext(opt.output_avi_file)
+    parts = [f"{base}.part{k:03d}{ext}" for k in range(len(chunks))]
+
+    done = [0] * len(chunks)
+    resumed = [0] * len(chunks)
+    written = [0] * len(chunks)
+    report.start(start_frame, end_frame, opt.output_avi_file, lambda: sum(written), len(chunks),
+                 len(range(start_frame, end_frame, stride)))
+
+    # With --resume, segments finished by an interrupted run are kept and the others resume on their own
+    checkpoint = _load_checkpoint(opt, report, True, end_frame, fps) if opt.resume else None
+    finished = {seg['chunk'] for seg in checkpoint.segments} if checkpoint else set()
+
+    # Each segment is a regular trimmed export of this script running in its own process
+    events = queue.Queue()
+    procs = {}
+    for k, ((a, b), part) in enumerate(zip(chunks, parts)):
+        if k in finished:
+            done[k] = len(range(a, b, stride))
+            written[k] = os.path.getsize(part)
+            continue
+        cmd = [sys.executable, '-u', os.path.abspath(__file__), '--mode', str(opt.mode),
+               '--input_svo_file', opt.input_svo_file, '--output_avi_file', part,
+               '--start_frame', str(a), '--end_frame', str(b), '--queue_depth', str(opt.queue_depth),
+               '--encoder', opt.encoder, '--codec', opt.codec, '--preset', opt.preset, '--crf', str(opt.crf),
+               '--fps', str(fps), '--stride', str(stride), '--scale', str(opt.scale), '--progress', 'json']
+        if opt.resume:
+            cmd += ['--resume', '--checkpoint_frames', str(opt.checkpoint_frames)]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        threading.Thread(target=_read_segment_output, args=(k, proc, events), daemon=True).start()
+        procs[k] = proc
+
+    running = len(procs)
+    try:
+        while running:
+            if cancel is not None and cancel.is_set():
+                for proc in procs.values(): proc.terminate()
+            try:
+                k, event, line = events.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if event is None and line is None:
+                running -= 1
+            elif event is None:
+                if line.strip():
+                    report.warning(f"[segment {k}] {line.strip()}")
+            elif event['event'] == 'start':
+                # A resumed segment counts its frames from its checkpoint
+                resumed[k] = (event['start_frame'] - chunks[k][0]) // stride
+            elif event['event'] in ('progress', 'done'):
+                done[k] = resumed[k] + event['frames_done']
+                written[k] = event['bytes_written']
+                report.update(sum(done))
+                if checkpoint and event['event'] == 'done' and event['status'] == 'ok':
+                    checkpoint.segments.append({'file': parts[k], 'chunk': k})
+                    checkpoint.save()
+            elif event['event'] in ('warning', 'error'):
+                getattr(report, event['event'])(f"[segment {k}] {event['message']}")
+    except KeyboardInterrupt:
+        for proc in procs.values(): proc.terminate()
+        raise
+
+    if cancel is not None and cancel.is_set():
+        for proc in procs.values(): proc.wait()
+        return report.finish(False, cancelled=True)
+
+    failed = False
+    for k, proc in procs.items():
+        if proc.wait() != 0:
+            report.error(f"Error: segment {k} (frames {chunks[k][0]}-{chunks[k][1]}) failed with exit code "
+                         f"{proc.returncode}.")
+            failed = True
+    if failed:
+        return report.finish(False)
+
+    if not join_videos(parts, opt.output_avi_file, lambda path: _open_writer(opt, path, fps, frame_size),
+                       warn=report.warning):
+        report.error(f"Error: the segments could not be joined into {opt.output_avi_file}. Check the .avi file "
+                     "path and write permissions.")
+        return report.finish(False)
+    for part in parts:
+        os.remove(part)
+    if checkpoint:
+        checkpoint.remove()
+    written[:] = [os.path.getsize(opt.output_avi_file)] + [0] * (len(written) - 1)
+    return report.finish()
+
+
+def _read_segment_output(k, proc, events):
+    for line in iter(proc.stdout.readline, ''):
+        event = parse_event(line)
+        events.put((k, event, None) if event else (k, None, line))
+    events.put((k, None, None))
+
+
+def _open_writer(opt, path, fps, frame_size):
+    codec = opt.codec or DEFAULT_CODECS[opt.encoder]
+    return open_video_writer(path, fps, frame_size, opt.encoder, codec, opt.preset, opt.crf)
+
+
+def build_parser():
     parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter)
     parser.add_argument('--mode', type = int, required=True, help= " Mode 0 is to export LEFT+RIGHT AVI. \n Mode 1 is to export LEFT+DEPTH_VIEW Avi. \n Mode 2 is to export LEFT+RIGHT image sequence. \n Mode 3 is to export LEFT+DEPTH_View image sequence. \n Mode 4 is to export LEFT+DEPTH_16BIT image sequence.")
     parser.add_argument('--input_svo_file', type=str, required=True, help='Path to the .svo file')
@@ -205,27 +1003,195 @@ if __name__ == "__main__":
     # --- NEW: Added start and end frame arguments ---
     parser.add_argument('--start_frame', type=int, default=0, help='Frame to start the export from')
     parser.add_argument('--end_frame', type=int, default=-1, help='Frame to end the export at (-1 means end of file)')
+    parser.add_argument('--stride', type=int, default=1, help='Export every Nth frame of the range (the frames in between are grabbed without depth or retrieved images)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Export images at this fraction of the camera resolution, e.g. 0.5 (the SDK retrieves them at that size)')
+    parser.add_argument('--queue_depth', type=int, default=4, help='Number of frames buffered between the grab, compose and write stages, each running on its own thread (0 runs them one after the other on a single thread)')
+    parser.add_argument('--writers', type=int, default=4, help='Image sequence modes only: number of threads encoding and writing PNG files in parallel (0 writes them on the main thread)')
+    parser.add_argument('--depth_format', type=str, default='png', choices=['png', 'npy'], help='Mode 4 only: write depth as one 16-bit PNG per frame (png) or as memory-mapped .npy chunks with a frame index (npy, read them with svo_depth.py)')
+    parser.add_argument('--depth_chunk_frames', type=int, default=1000, help='Depth frames per .npy chunk with --depth_format npy')
+    parser.add_argument('--encoder', type=str, default='opencv', choices=VIDEO_ENCODERS, help='AVI modes only: video backend, the OpenCV writer (opencv) or a pipe into a local ffmpeg binary (ffmpeg)')
+    parser.add_argument('--codec', type=str, default='', help='AVI modes only: FOURCC for the opencv encoder (M4S2, MJPG, FFV1, XVID, H264; default M4S2) or ffmpeg encoder name (libx264, libx265, ffv1, mjpeg, ...; default libx264)')
+    parser.add_argument('--preset', type=str, default='medium', help='ffmpeg encoder only: x264/x265 preset (ultrafast ... veryslow)')
+    parser.add_argument('--crf', type=int, default=23, help='ffmpeg encoder only: x264/x265 constant rate factor (lower is better quality)')
+    parser.add_argument('--fps', type=float, default=0, help='AVI modes only: output frame rate (0 uses the camera frame rate, at least 25)')
+    parser.add_argument('--progress', type=str, default='bar', choices=['bar', 'json'], help='Progress output: a text progress bar (bar) or one JSON event per line with frames done, fps, bytes written, ETA and errors (json)')
+    parser.add_argument('--segments', type=int, default=1, help='AVI modes only: split the frame range into this many chunks, convert them in parallel processes and join them into one AVI')
+    parser.add_argument('--profile', action='store_true', help='Time every stage of the export loop (grab, retrieve, compose, encode, imwrite, ...) and print p50/p95/max latencies, fps over time and peak memory at the end')
+    parser.add_argument('--profile_file', type=str, default='', help='With --profile: also write the profile summary to this JSON file')
+    parser.add_argument('--ranges', type=str, default='', help='Export several frame ranges in one pass instead of --start_frame/--end_frame: "START-END,START-END,..." (END excluded) or a CSV file with start_frame,end_frame[,name] rows. Writes <output_avi_file>_<name>.avi or the folder <output_path_dir>/<name> per range, name defaulting to START_END')
+    parser.add_argument('--resume', action='store_true', help='Save checkpoints while exporting and continue an interrupted export with the same parameters from its last checkpoint')
+    parser.add_argument('--checkpoint_frames', type=int, default=1000, help='With --resume: frames between checkpoints (0 saves one only when the export stops). In AVI modes every checkpoint closes a segment file, the segments are joined at the end')
+
+    return parser
+
+
+def make_options(**kwargs):
+    # Options for convert(): the command-line defaults, overridden by keyword arguments
+    opt = argparse.Namespace(**{a.dest: a.default for a in build_parser()._actions if a.dest != 'help'})
+    unknown = set(kwargs) - set(vars(opt))
+    if unknown:
+        raise TypeError(f"Unknown export option(s): {', '.join(sorted(unknown))}")
+    vars(opt).update(kwargs)
+    return opt
 
-    opt = parser.parse_args()
-    if opt.mode > 4 or opt.mode < 0 :
-        print("Mode shoud be between 0 and 4 included. \n Mode 0 is to export LEFT+RIGHT AVI. \n Mode 1 is to export LEFT+DEPTH_VIEW Avi. \n Mode 2 is to export LEFT+RIGHT image sequence. \n Mode 3 is to export LEFT+DEPTH_View image sequence. \n Mode 4 is to export LEFT+DEPTH_16BIT image sequence.")
-        exit()
-    if not opt.input_svo_file.endswith(".svo") and not opt.input_svo_file.endswith(".svo2"): 
-        print("--input_svo_file parameter should be a .svo file but is not : ",opt.input_svo_file,"Exit program.")
-        exit()
+
+def validate_options(opt):
+    # Error message for invalid options, None when they are fine
+    if opt.mode is None or opt.mode > 4 or opt.mode < 0 :
+        return "Mode shoud be between 0 and 4 included. \n Mode 0 is to export LEFT+RIGHT AVI. \n Mode 1 is to export LEFT+DEPTH_VIEW Avi. \n Mode 2 is to export LEFT+RIGHT image sequence. \n Mode 3 is to export LEFT+DEPTH_View image sequence. \n Mode 4 is to export LEFT+DEPTH_16BIT image sequence."
+    if not opt.input_svo_file or (not opt.input_svo_file.endswith(".svo") and not opt.input_svo_file.endswith(".svo2")):
+        return f"--input_svo_file parameter should be a .svo file but is not : {opt.input_svo_file} Exit program."
     if not os.path.isfile(opt.input_svo_file):
-        print("--input_svo_file parameter should be an existing file but is not : ",opt.input_svo_file,"Exit program.")
-        exit()
+        return f"--input_svo_file parameter should be an existing file but is not : {opt.input_svo_file} Exit program."
     if opt.mode < 2 and len(opt.output_avi_file)==0:
-        print("In mode ",opt.mode,", output_avi_file parameter needs to be specified.")
-        exit()
+        return f"In mode {opt.mode}, output_avi_file parameter needs to be specified."
     if opt.mode < 2 and not opt.output_avi_file.endswith(".avi"):
-        print("--output_avi_file parameter should be a .avi file but is not : ",opt.output_avi_file,"Exit program.")
-        exit()
+        return f"--output_avi_file parameter should be a .avi file but is not : {opt.output_avi_file} Exit program."
     if opt.mode >=2  and len(opt.output_path_dir)==0 :
-        print("In mode ",opt.mode,", output_path_dir parameter needs to be specified.")
-        exit()
+        return f"In mode {opt.mode}, output_path_dir parameter needs to be specified."
     if opt.mode >=2 and not os.path.isdir(opt.output_path_dir):
-        print("--output_path_dir parameter should be an existing folder but is not : ",opt.output_path_dir,"Exit program.")
-        exit()
-    main(opt)
\ No newline at end of file
+        return f"--output_path_dir parameter should be an existing folder but is not : {opt.output_path_dir} Exit program."
+    if opt.stride < 1:
+        return f"--stride parameter should be at least 1 but is : {opt.stride} Exit program."
+    if not 0 < opt.scale <= 1:
+        return f"--scale parameter should be in (0, 1] but is : {opt.scale} Exit program."
+    if opt.segments < 1:
+        return f"--segments parameter should be at least 1 but is : {opt.segments} Exit program."
+    if opt.segments > 1 and not shutil.which('ffmpeg'):
+        # Without ffmpeg the segments would be joined by decoding and re-encoding them on one thread
+        return "--segments needs ffmpeg on the PATH to join the segments. Exit program."
+    if opt.ranges:
+        if opt.segments > 1 or opt.resume:
+            return "--ranges cannot be combined with --segments or --resume. Exit program."
+        try:
+            if not ranges_from_option(opt.ranges):
+                return f"--ranges parameter does not contain any frame range : {opt.ranges} Exit program."
+        except (OSError, ValueError) as e:
+            return f"--ranges parameter is invalid : {e} Exit program."
+    return None
+
+
+def probe_svo(path, read_bytes=PREFETCH_BYTES):
+    """Warm up and check an SVO ahead of its conversion. Returns None when it is fine, else an error message.
+
+    The first and last `read_bytes` of the file are read (into the OS page cache, which helps most for
+    files on network storage), then the SVO is opened without depth and its first frame grabbed.
+    """
+    try:
+        size = os.path.getsize(path)
+        offsets = [0] if size <= read_bytes else [0, max(read_bytes, size - read_bytes)]
+        buf = bytearray(1 << 20)
+        with open(path, 'rb', buffering=0) as f:
+            for offset in offsets:
+                f.seek(offset)
+                remaining = read_bytes
+                while remaining > 0:
+                    n = f.readinto(buf)
+                    if not n: break
+                    remaining -= n
+    except OSError as e:
+        return f"Could not read the file: {e}"
+
+    init_params = sl.InitParameters()
+    init_params.set_from_svo_file(path)
+    init_params.svo_real_time_mode = False
+    init_params.depth_mode = sl.DEPTH_MODE.NONE
+    zed = sl.Camera()
+    err = zed.open(init_params)
+    try:
+        if err != sl.ERROR_CODE.SUCCESS:
+            return f"Could not open the SVO: {err!r}"
+        if zed.get_svo_number_of_frames() <= 0:
+            return "The SVO contains no frames"
+        rt_param = sl.RuntimeParameters()
+        rt_param.enable_depth = False
+        err = zed.grab(rt_param)
+        if err != sl.ERROR_CODE.SUCCESS:
+            return f"Could not read the first frame: {err!r}"
+    finally:
+        zed.close()
+    return None
+
+
+class ExportWorker:
+    """A long-lived process that runs convert() for one job at a time.
+
+    pyzed, numpy and cv2 are imported once when the process starts and reused for every job, so
+    converting many short files does not pay the interpreter and SDK start-up for each of them.
+    """
+    CANCEL_TIMEOUT = 10.0
+
+    def __init__(self):
+        self.ctx = multiprocessing.get_context('spawn')
+        self.process = None
+
+    def _ensure_started(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        self.jobs = self.ctx.Queue()
+        self.events = self.ctx.Queue()
+        self.cancel_event = self.ctx.Event()
+        self.process = self.ctx.Process(target=_worker_loop, args=(self.jobs, self.events, self.cancel_event),
+                                        daemon=True)
+        self.process.start()
+
+    def run(self, on_event=None, **options):
+        # Convert with the given options (see make_options) in the worker; returns like convert()
+        self._ensure_started()
+        self.cancel_event.clear()
+        self.jobs.put(options)
+        cancel_time = None
+        while True:
+            try:
+                event = self.events.get(timeout=0.2)
+            except queue.Empty:
+                if self.cancel_event.is_set():
+                    cancel_time = cancel_time or time.time()
+                    if time.time() - cancel_time > self.CANCEL_TIMEOUT:
+                        # The job does not react to cancellation, drop the whole worker
+                        self.process.terminate()
+                if not self.process.is_alive():
+                    if on_event:
+                        on_event({'event': 'error', 'message': f"Export worker exited with code {self.process.exitcode}."})
+                    return 1
+                continue
+            if on_event:
+                on_event(event)
+            if event['event'] == 'done':
+                return 0 if event['status'] == 'ok' else 1
+
+    def cancel(self):
+        if self.process is not None:
+            self.cancel_event.set()
+
+    def close(self):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.jobs.put(None)
+            self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+
+
+def _worker_loop(jobs, events, cancel):
+    while True:
+        options = jobs.get()
+        if options is None:
+            return
+        try:
+            convert(make_options(**options), on_event=events.put, cancel=cancel)
+        except Exception as e:
+            events.put({'event': 'error', 'message': f"Error: {e!r}"})
+            events.put({'event': 'done', 'status': 'error', 'frames_done': 0, 'total_frames': 0,
+                        'elapsed_s': 0.0, 'fps': 0.0, 'bytes_written': 0})
+
+
+if __name__ == "__main__":
+    opt = build_parser().parse_args()
+    err = validate_options(opt)
+    if err:
+        print(err)
+        sys.exit(1)
+    sys.exit(main(opt))
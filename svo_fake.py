@@ -0,0 +1,259 @@
+"""
+Drop-in stand-in for the parts of pyzed.sl used by svo_export.py and svo_images.py.
+
+It lets the export code run on CPU-only machines without the ZED SDK, e.g. for svo_bench.py:
+
+    import svo_fake
+    svo_fake.install()                  # `import pyzed.sl` now returns this module
+    svo_fake.write_synthetic_svo('clip.svo2', width=1280, height=720, frames=300)
+    import svo_export                   # opens clip.svo2 through the fake camera
+
+A synthetic SVO is a small JSON file describing the recording. The camera serves deterministic
+left/right/depth images for it: a few precomputed variants are cycled, so handing out a frame costs
+about as much as the copy into the sl.Mat the real SDK does, and benchmarks measure the export code.
+
+Like a compressed recording, it is made of groups of `gop` frames that start with a keyframe: a grab
+after any seek decodes again from the keyframe, a sequential grab decodes a single frame. The
+decoded frames are counted in Camera.decoded_frames (Camera.total_decoded_frames for all cameras), and `decode_ms` adds that much time per decoded
+frame to model the cost of the codec.
+"""
+
+import enum
+import json
+import sys
+import time
+import types
+
+import numpy as np
+import cv2
+
+VARIANTS = 8
+
+
+class ERROR_CODE(enum.Enum):
+    SUCCESS = 0
+    FAILURE = 1
+    END_OF_SVOFILE_REACHED = 2
+    INVALID_SVO_FILE = 3
+
+    def __repr__(self):
+        return self.name
+
+
+class VIEW(enum.Enum):
+    LEFT = 0
+    RIGHT = 1
+    SIDE_BY_SIDE = 2
+    DEPTH = 3
+
+
+class DEPTH_MODE(enum.Enum):
+    NONE = 0
+    PERFORMANCE = 1
+    QUALITY = 2
+    ULTRA = 3
+    NEURAL = 4
+
+
+class MEASURE(enum.Enum):
+    DEPTH = 0
+
+
+class UNIT(enum.Enum):
+    MILLIMETER = 0
+    METER = 1
+
+
+class MEM(enum.Enum):
+    CPU = 0
+
+
+class TIME_REFERENCE(enum.Enum):
+    IMAGE = 0
+    CURRENT = 1
+
+
+class Resolution:
+    def __init__(self, width=0, height=0):
+        self.width = width
+        self.height = height
+
+
+class InitParameters:
+    def __init__(self):
+        self.svo_input_filename = ''
+        self.svo_real_time_mode = False
+        self.coordinate_units = UNIT.MILLIMETER
+        self.depth_mode = DEPTH_MODE.ULTRA
+
+    def set_from_svo_file(self, path):
+        self.svo_input_filename = path
+
+
+class RuntimeParameters:
+    def __init__(self, enable_depth=True):
+        self.enable_depth = enable_depth
+
+
+class Mat:
+    def __init__(self):
+        self.data = None
+
+    def get_data(self, *args, **kwargs):
+        return self.data
+
+    def _set(self, image):
+        # Reuse the buffer like the SDK does when the size does not change
+        if self.data is None or self.data.shape != image.shape or self.data.dtype != image.dtype:
+            self.data = np.empty_like(image)
+        np.copyto(self.data, image)
+
+
+class Timestamp:
+    def __init__(self, ns):
+        self.ns = ns
+
+    def get_milliseconds(self):
+        return self.ns // 1000000
+
+    def get_nanoseconds(self):
+        return self.ns
+
+
+def write_synthetic_svo(path, width=1280, height=720, frames=300, fps=30, gop=30, decode_ms=0.0):
+    # Describe a synthetic recording that the fake camera can open
+    with open(path, 'w') as f:
+        json.dump({'synthetic_svo': 1, 'width': width, 'height': height, 'frames': frames, 'fps': fps,
+                   'gop': gop, 'decode_ms': decode_ms}, f)
+
+
+class _Info:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class Camera:
+    total_decoded_frames = 0
+
+    def __init__(self):
+        self.header = None
+        self.cache = {}
+
+    def open(self, init_params):
+        try:
+            with open(init_params.svo_input_filename) as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            return ERROR_CODE.INVALID_SVO_FILE
+        if header.get('synthetic_svo') != 1:
+            return ERROR_CODE.INVALID_SVO_FILE
+        self.header = header
+        self.width, self.height = header['width'], header['height']
+        self.frames, self.fps = header['frames'], header['fps']
+        self.gop = max(1, header.get('gop', 1))
+        self.decode_ms = header.get('decode_ms', 0.0)
+        self.position = 0
+        self.current = -1
+        self.decoded_frames = 0
+        self.seeked = True
+        return ERROR_CODE.SUCCESS
+
+    def close(self):
+        self.header = None
+        self.cache = {}
+
+    def get_camera_information(self):
+        config = _Info(resolution=Resolution(self.width, self.height), fps=self.fps)
+        return _Info(camera_configuration=config)
+
+    def get_svo_number_of_frames(self):
+        return self.frames
+
+    def set_svo_position(self, position):
+        self.position = min(max(0, position), self.frames)
+        self.seeked = True
+
+    def get_svo_position(self):
+        return self.current
+
+    def grab(self, runtime_parameters=None):
+        if self.position >= self.frames:
+            return ERROR_CODE.END_OF_SVOFILE_REACHED
+        if not self.seeked:
+            decoded = 1
+        else:
+            # After a seek, the frames from the keyframe of the group are decoded again
+            decoded = self.position % self.gop + 1
+        self.decoded_frames += decoded
+        Camera.total_decoded_frames += decoded
+        if self.decode_ms:
+            time.sleep(decoded * self.decode_ms / 1000)
+        self.current = self.position
+        self.position += 1
+        self.seeked = False
+        return ERROR_CODE.SUCCESS
+
+    def get_timestamp(self, reference=TIME_REFERENCE.IMAGE):
+        return Timestamp(int(max(self.current, 0) * 1e9 / self.fps))
+
+    def retrieve_image(self, mat, view=VIEW.LEFT, mem=MEM.CPU, resolution=None):
+        width, height = self._size(resolution)
+        if view == VIEW.SIDE_BY_SIDE:
+            image = self._variant('sbs', width, height)
+        else:
+            image = self._variant(view.name.lower(), width, height)
+        mat._set(image)
+        return ERROR_CODE.SUCCESS
+
+    def retrieve_measure(self, mat, measure=MEASURE.DEPTH, mem=MEM.CPU, resolution=None):
+        width, height = self._size(resolution)
+        mat._set(self._variant('depth_measure', width, height))
+        return ERROR_CODE.SUCCESS
+
+    def _size(self, resolution):
+        if resolution is None or not resolution.width:
+            return self.width, self.height
+        return resolution.width, resolution.height
+
+    def _variant(self, kind, width, height):
+        key = (kind, width, height)
+        if key not in self.cache:
+            self.cache[key] = [_synthetic(kind, width, height, k) for k in range(VARIANTS)]
+        return self.cache[key][self.current % VARIANTS]
+
+
+def _synthetic(kind, width, height, k):
+    # Deterministic image `k` of a kind: textured BGRA views (with some noise so PNG and video encoders
+    # are not flattered) or float32 depth in millimetres
+    yy, xx = np.mgrid[0:height, 0:width]
+    if kind == 'depth_measure':
+        depth = 800.0 + 4.0 * yy + 2.0 * xx + 50.0 * np.sin((xx + 3 * k) / 37.0) * np.cos(yy / 23.0)
+        return depth.astype(np.float32)
+    if kind == 'sbs':
+        return np.concatenate([_synthetic('left', width, height, k), _synthetic('right', width, height, k)], axis=1)
+    shift = {'left': 0, 'right': 9, 'depth': 0}[kind]
+    rng = np.random.default_rng(k * 4 + len(kind))
+    img = np.empty((height, width, 4), dtype=np.uint8)
+    if kind == 'depth':
+        # Grey depth view, like sl.VIEW.DEPTH
+        grey = ((xx + yy + 5 * k) % 256).astype(np.uint8)
+        img[..., 0] = img[..., 1] = img[..., 2] = grey
+    else:
+        img[..., 0] = (xx + shift + 7 * k) % 256
+        img[..., 1] = (yy + 13 * k) % 256
+        img[..., 2] = (xx + yy + 29 * k) % 256
+        img[..., :3] = cv2.add(np.ascontiguousarray(img[..., :3]), rng.integers(0, 24, (height, width, 3), dtype=np.uint8))
+    img[..., 3] = 255
+    return img
+
+
+def install():
+    # Make `import pyzed.sl` return this module (only when the real SDK is not already imported)
+    if 'pyzed.sl' in sys.modules:
+        return sys.modules['pyzed.sl']
+    package = types.ModuleType('pyzed')
+    package.__path__ = []
+    package.sl = sys.modules[__name__]
+    sys.modules['pyzed'] = package
+    sys.modules['pyzed.sl'] = sys.modules[__name__]
+    return sys.modules[__name__]
@@ -0,0 +1,255 @@
+"""
+Image sequence exports of the GUI's trim and AVI panels, without any Tk dependency.
+
+svo_conv.py runs these functions on its worker threads; svo_bench.py runs them directly (with
+svo_fake standing in for the ZED SDK) to measure them.
+"""
+
+import io
+import multiprocessing
+import os
+import queue
+import sys
+
+import cv2
+from PIL import Image
+
+from svo_avi_images import MAX_GRAB_GAP, frame_name, export_avi_part, avi_part_worker
+from svo_profile import NULL_PROFILER
+from svo_ranges import visit_plan
+
+try:
+    import pyzed.sl as sl
+except ImportError:
+    sl = None
+
+MIN_FRAMES_PER_PROCESS = 500  # AVI parts below that size do not pay for the start-up of a process
+
+
+def _open_svo(in_file):
+    zed = sl.Camera()
+    ip  = sl.InitParameters()
+    ip.set_from_svo_file(in_file)
+    ip.svo_real_time_mode = False
+    # Only images are exported, grabs do not need to compute depth
+    ip.depth_mode = sl.DEPTH_MODE.NONE
+    if zed.open(ip) != sl.ERROR_CODE.SUCCESS:
+        raise IOError('Could not open SVO file.')
+    return zed
+
+
+class _SideRetriever:
+    """Retrieves the exported side of the current frame as RGB, at the exported scale."""
+    def __init__(self, zed, side, scale, profiler):
+        self.zed = zed
+        self.side = side
+        self.profiler = profiler
+        self.image = sl.Mat()
+        self.image_right = sl.Mat()
+        # Reduced resolutions are retrieved at that size by the SDK, left and right separately for 'both'
+        self.retrieve_args = ()
+        if scale != 1:
+            res = zed.get_camera_information().camera_configuration.resolution
+            self.retrieve_args = (sl.MEM.CPU, sl.Resolution(max(2, round(res.width * scale)), max(2, round(res.height * scale))))
+        self.view_mode = sl.VIEW.LEFT
+        if side == 'right': self.view_mode = sl.VIEW.RIGHT
+        elif side == 'both': self.view_mode = sl.VIEW.SIDE_BY_SIDE
+
+    def rgb(self):
+        with self.profiler.time('retrieve'):
+            if self.retrieve_args and self.side == 'both':
+                self.zed.retrieve_image(self.image, sl.VIEW.LEFT, *self.retrieve_args)
+                self.zed.retrieve_image(self.image_right, sl.VIEW.RIGHT, *self.retrieve_args)
+                bgra = cv2.hconcat([self.image.get_data(), self.image_right.get_data()])
+            else:
+                self.zed.retrieve_image(self.image, self.view_mode, *self.retrieve_args)
+                bgra = self.image.get_data()
+        with self.profiler.time('cvtColor'):
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+
+
+def _skip_params():
+    # Runtime parameters of the grabs through skipped frames: nothing is computed or retrieved for them
+    rt = sl.RuntimeParameters()
+    rt.enable_depth = False
+    return rt
+
+
+def _grab(zed, fn, expected, profiler, skip_param):
+    # Grab frame `fn`. Frames up to MAX_GRAB_GAP after the one expected from the previous grab are
+    # grabbed through with `skip_param`, as a seek can make the SDK decode again from the last keyframe;
+    # the SVO is only repositioned over larger gaps. Returns the frame to expect next, or None when the
+    # grab failed.
+    if expected is not None and 0 < fn - expected <= MAX_GRAB_GAP:
+        with profiler.time('skip'):
+            while expected < fn and zed.grab(skip_param) == sl.ERROR_CODE.SUCCESS:
+                expected += 1
+    if fn != expected:
+        with profiler.time('seek'):
+            zed.set_svo_position(fn)
+    with profiler.time('grab'):
+        grabbed = zed.grab() == sl.ERROR_CODE.SUCCESS
+    if grabbed and fn == expected and zed.get_svo_position() != fn:
+        # The recording skips frames here, fetch the requested one like a seek would
+        with profiler.time('seek'):
+            zed.set_svo_position(fn)
+        with profiler.time('grab'):
+            grabbed = zed.grab() == sl.ERROR_CODE.SUCCESS
+    return fn + 1 if grabbed else None
+
+
+def export_svo_images(in_file, image_folder, frame_numbers, side='left', scale=1.0, stop=None, progress=None,
+                      profiler=NULL_PROFILER):
+    """Write frame_NNNNNN.png for every SVO frame in `frame_numbers` and return the number written.
+
+    `side` is 'left', 'right' or 'both' (side by side). `progress(pct)` is called after every frame and
+    the export ends early once the `stop` Event is set. The frames are grabbed sequentially, through
+    the skipped ones of a stride, and the SVO is repositioned only over gaps larger than MAX_GRAB_GAP.
+    Raises IOError when the SVO cannot be opened.
+    """
+    zed = _open_svo(in_file)
+    retriever = _SideRetriever(zed, side, scale, profiler)
+    skip_param = _skip_params()
+    total = max(1, len(frame_numbers) - 1)
+    written = 0
+    expected = None
+
+    try:
+        for i, fn in enumerate(frame_numbers):
+            if stop is not None and stop.is_set():
+                break
+            expected = _grab(zed, fn, expected, profiler, skip_param)
+            if expected is not None:
+                rgb = retriever.rgb()
+                with profiler.time('save_png'):
+                    Image.fromarray(rgb).save(os.path.join(image_folder, frame_name(fn)))
+                profiler.frame()
+                written += 1
+
+            if progress: progress((i / total) * 100)
+    finally:
+        zed.close()
+    return written
+
+
+def export_svo_image_ranges(in_file, outputs, side='left', scale=1.0, stop=None, progress=None,
+                            profiler=NULL_PROFILER):
+    """Export several frame ranges of one SVO in a single pass and return the number of files written.
+
+    `outputs` is a list of (image_folder, frame_numbers). The frames of all ranges are decoded once in
+    ascending order, seeking only over gaps larger than MAX_GRAB_GAP; a frame shared by overlapping
+    ranges is retrieved and PNG encoded once and written to each of their folders.
+    """
+    plan = visit_plan([frames for _, frames in outputs])
+    zed = _open_svo(in_file)
+    retriever = _SideRetriever(zed, side, scale, profiler)
+    skip_param = _skip_params()
+    total = max(1, len(plan) - 1)
+    written = 0
+    expected = None
+
+    try:
+        for i, (fn, owners) in enumerate(plan):
+            if stop is not None and stop.is_set():
+                break
+            expected = _grab(zed, fn, expected, profiler, skip_param)
+            if expected is not None:
+                rgb = retriever.rgb()
+                with profiler.time('save_png'):
+                    png = io.BytesIO()
+                    Image.fromarray(rgb).save(png, format='PNG')
+                    for k in owners:
+                        with open(os.path.join(outputs[k][0], frame_name(fn)), 'wb') as f:
+                            f.write(png.getbuffer())
+                profiler.frame()
+                written += len(owners)
+
+            if progress: progress((i / total) * 100)
+    finally:
+        zed.close()
+    return written
+
+
+def export_avi_images(in_file, image_folder, frame_numbers, side='left', scale=1.0, stop=None, progress=None,
+                      profiler=NULL_PROFILER, processes=1, writers=4):
+    """Write frame_NNNNNN.png for every AVI frame in `frame_numbers` and return the number written.
+
+    `side` crops the side-by-side video to 'left', 'right' or keeps 'both'. The video is read
+    sequentially after a single seek (skipped frames are grabbed without decoding them to images), and
+    `writers` threads encode the PNG files. With `processes` > 1 the frames are split into that many
+    contiguous parts, each read by its own VideoCapture in a worker process. Unreadable frames are
+    skipped; after more than 10 the export is aborted with an IOError.
+    """
+    processes = max(1, min(processes, len(frame_numbers) // MIN_FRAMES_PER_PROCESS))
+    if processes > 1:
+        return _export_avi_parallel(in_file, image_folder, frame_numbers, side, scale, stop, progress, profiler,
+                                    processes, writers)
+    total = max(1, len(frame_numbers) - 1)
+    on_frame = (lambda i: progress((i / total) * 100)) if progress else None
+    return export_avi_part(in_file, image_folder, frame_numbers, side, scale, stop, on_frame, profiler, writers)
+
+
+def _export_avi_parallel(in_file, image_folder, frame_numbers, side, scale, stop, progress, profiler, processes,
+                         writers):
+    # Split the frames into contiguous parts, exported by worker processes that report their progress
+    ctx = multiprocessing.get_context('spawn')
+    events = ctx.Queue()
+    cancel = ctx.Event()
+    bounds = [len(frame_numbers) * k // processes for k in range(processes + 1)]
+    workers = [ctx.Process(target=avi_part_worker, daemon=True,
+                           args=(k, in_file, image_folder, frame_numbers[a:b], side, scale, cancel, events,
+                                 profiler.enabled, writers))
+               for k, (a, b) in enumerate(zip(bounds[:-1], bounds[1:]))]
+    _start_workers(workers)
+
+    total = max(1, len(frame_numbers) - 1)
+    done = [0] * processes
+    written = 0
+    error = None
+    running = processes
+    try:
+        while running:
+            if stop is not None and stop.is_set():
+                cancel.set()
+            try:
+                k, kind, value = events.get(timeout=0.2)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    error = error or IOError('An AVI export process exited unexpectedly.')
+                    break
+                continue
+            if kind == 'progress':
+                profiler.frame(value - done[k])
+                done[k] = value
+                if progress: progress((sum(done) - 1) / total * 100)
+            elif kind == 'stages':
+                profiler.merge(value)
+            elif kind == 'error':
+                # One part failed: stop the others, like the single-process export stops at the error
+                error = error or IOError(value)
+                cancel.set()
+            elif kind == 'done':
+                written += value
+                running -= 1
+    finally:
+        cancel.set()
+        for worker in workers:
+            worker.join()
+    if error:
+        raise error
+    return written
+
+
+def _start_workers(workers):
+    # A spawned process runs the parent's main script again (as __mp_main__) before its target. For the
+    # GUI that means Tk, PIL and the ZED SDK, seconds of start-up per process: the script is hidden while
+    # the workers start, they only import svo_avi_images.
+    main = sys.modules['__main__']
+    saved = {name: main.__dict__[name] for name in ('__file__', '__spec__') if name in main.__dict__}
+    main.__dict__.pop('__file__', None)
+    main.__spec__ = None
+    try:
+        for worker in workers:
+            worker.start()
+    finally:
+        main.__dict__.update(saved)
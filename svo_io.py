@@ -0,0 +1,223 @@
+"""
+Frame composition and output helpers shared by svo_export.py and svo_conv.py.
+
+Nothing in here depends on the ZED SDK, so the helpers can also be used (and benchmarked)
+on machines without pyzed.
+"""
+
+import os
+import json
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import cv2
+
+from svo_profile import NULL_PROFILER
+
+VIDEO_ENCODERS = ('opencv', 'ffmpeg')
+DEFAULT_CODECS = {'opencv': 'M4S2', 'ffmpeg': 'libx264'}
+OPENCV_FOURCCS = ('M4S2', 'MJPG', 'FFV1', 'XVID', 'H264')
+
+
+def rgba_to_rgb(src, dst):
+    # Drop the alpha channel of a 4-channel frame straight into the preallocated `dst`
+    return cv2.cvtColor(src, cv2.COLOR_RGBA2RGB, dst=dst)
+
+
+def compose_sbs_rgb(left, right, dst):
+    # Write left and right 4-channel frames side by side into the 3-channel `dst`, without an
+    # intermediate side-by-side RGBA buffer. Each half of `dst` is a view, so nothing is allocated.
+    width = left.shape[1]
+    cv2.cvtColor(left, cv2.COLOR_RGBA2RGB, dst=dst[:, :width])
+    cv2.cvtColor(right, cv2.COLOR_RGBA2RGB, dst=dst[:, width:])
+    return dst
+
+
+def parse_event(line):
+    # JSON-lines progress event printed by svo_export.py --progress json, or None for any other output
+    line = line.strip()
+    if not line.startswith('{'):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and 'event' in event else None
+
+
+class ImageWriterPool:
+    """Encodes and writes images with cv2.imwrite on a bounded pool of threads.
+
+    PNG compression releases the GIL, so the writes run in parallel with each other and with the grab
+    loop. At most `max_pending` images are queued or being written; submit() blocks beyond that.
+    With workers=0 every image is written synchronously by submit() itself. The encode+write time of
+    each image is recorded as the 'imwrite' stage of `profiler`.
+    """
+    def __init__(self, workers=4, max_pending=None, profiler=NULL_PROFILER):
+        self.workers = max(0, workers)
+        self.profiler = profiler
+        self.executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers else None
+        self.slots = threading.BoundedSemaphore(max_pending or max(1, self.workers) * 2)
+        self.lock = threading.Lock()
+        self.failures = []
+        self.failed = 0
+        self.written = 0
+        self.bytes_written = 0
+
+    def submit(self, path, image, on_done=None):
+        # `image` must stay untouched until `on_done` has been called
+        if self.executor is None:
+            self._write(path, image, on_done)
+            return
+        self.slots.acquire()
+        try:
+            self.executor.submit(self._write, path, image, on_done, self.slots)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def _write(self, path, image, on_done, slots=None):
+        try:
+            with self.profiler.time('imwrite'):
+                ok = cv2.imwrite(path, image)
+            if not ok:
+                raise IOError("cv2.imwrite returned False")
+            size = os.path.getsize(path)
+            with self.lock:
+                self.written += 1
+                self.bytes_written += size
+        except Exception as e:
+            with self.lock:
+                self.failures.append((path, e))
+                self.failed += 1
+        finally:
+            if slots is not None:
+                slots.release()
+            if on_done is not None:
+                on_done()
+
+    def pop_failures(self):
+        # Failures since the last call, as (path, exception) pairs
+        with self.lock:
+            failures, self.failures = self.failures, []
+        return failures
+
+    def close(self):
+        # Wait for every pending write to finish
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+class OpenCVVideoWriter:
+    """cv2.VideoWriter with a selectable FOURCC (M4S2 is the historical svo_export codec)."""
+    def __init__(self, path, fps, frame_size, fourcc='M4S2'):
+        self.path = path
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size)
+
+    def isOpened(self):
+        return self.writer.isOpened()
+
+    def write(self, frame):
+        self.writer.write(frame)
+
+    def release(self):
+        # Error message, or None when the file was written (cv2.VideoWriter does not tell)
+        self.writer.release()
+        return None
+
+
+class FFmpegPipeWriter:
+    """Pipes raw BGR frames into a local ffmpeg binary.
+
+    `preset` and `crf` are passed on for the x264/x265 encoders, which are the ones that understand them.
+    """
+    def __init__(self, path, fps, frame_size, codec='libx264', preset='medium', crf=23, ffmpeg=None):
+        self.path = path
+        self.proc = None
+        ffmpeg = ffmpeg or shutil.which('ffmpeg')
+        if not ffmpeg:
+            return
+        width, height = frame_size
+        cmd = [ffmpeg, '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+               '-an', '-c:v', codec]
+        if codec in ('libx264', 'libx265'):
+            cmd += ['-preset', preset, '-crf', str(crf), '-pix_fmt', 'yuv420p']
+        cmd.append(path)
+        cf = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        try:
+            self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, creationflags=cf)
+        except OSError:
+            self.proc = None
+
+    def isOpened(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def write(self, frame):
+        try:
+            self.proc.stdin.write(memoryview(np.ascontiguousarray(frame)))
+        except (BrokenPipeError, OSError):
+            raise IOError(f"ffmpeg stopped while writing {self.path} (exit code {self.proc.poll()})")
+
+    def release(self):
+        # Error message when ffmpeg failed (the file is then broken or truncated), None when it is complete
+        if self.proc is None:
+            return None
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        if self.proc.wait() != 0:
+            return f"ffmpeg exited with code {self.proc.returncode} while writing {self.path}"
+        return None
+
+
+def open_video_writer(path, fps, frame_size, encoder='opencv', codec='M4S2', preset='medium', crf=23):
+    # `codec` is a FOURCC for the opencv encoder and an ffmpeg encoder name (libx264, ffv1, ...) for ffmpeg
+    if encoder == 'ffmpeg':
+        return FFmpegPipeWriter(path, fps, frame_size, codec, preset, crf)
+    return OpenCVVideoWriter(path, fps, frame_size, codec)
+
+
+def join_videos(parts, output_path, open_writer, warn=None):
+    # Concatenate video files in order. Stream copy with ffmpeg keeps the encoded frames untouched;
+    # without it the parts are decoded and re-encoded with a writer from open_writer(output_path), which
+    # is reported through warn(message). Returns False when the output cannot be written.
+    warn = warn or (lambda message: sys.stdout.write(f"\n{message}\n"))
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg:
+        list_path = output_path + '.segments.txt'
+        with open(list_path, 'w') as f:
+            for part in parts:
+                f.write("file '%s'\n" % os.path.abspath(part).replace("'", "'\\''"))
+        rc = subprocess.call([ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                              '-i', list_path, '-c', 'copy', output_path])
+        os.remove(list_path)
+        if rc == 0:
+            return True
+        warn("ffmpeg could not join the segments, decoding and re-encoding them instead (slower, and a second "
+             "lossy pass).")
+    else:
+        warn("ffmpeg not found: the segments are decoded and re-encoded to be joined (slower, and a second "
+             "lossy pass).")
+
+    video_writer = open_writer(output_path)
+    if not video_writer.isOpened():
+        return False
+    for part in parts:
+        cap = cv2.VideoCapture(part)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            video_writer.write(frame)
+        cap.release()
+    error = video_writer.release()
+    if error:
+        warn(error)
+        return False
+    return True
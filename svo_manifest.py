@@ -0,0 +1,92 @@
+"""
+Manifest of the SVO files converted by a batch run, so that a rerun only converts new or changed inputs.
+
+The manifest is a JSON file in the output folder (.svo_manifest.json) with one entry per source file:
+its path, size and modification time, optionally a content fingerprint, the conversion parameters and
+the output path. Checking a file against it only needs a stat() call.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+MANIFEST_FILE = '.svo_manifest.json'
+FINGERPRINT_BYTES = 1 << 20
+
+
+def fingerprint(path):
+    # SHA-1 of the size and the first and last MiB: cheap even for multi-GB recordings, and enough to
+    # recognise a copied or touched file whose content did not change
+    h = hashlib.sha1()
+    size = os.path.getsize(path)
+    h.update(str(size).encode())
+    with open(path, 'rb') as f:
+        h.update(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, size - FINGERPRINT_BYTES))
+            h.update(f.read(FINGERPRINT_BYTES))
+    return h.hexdigest()
+
+
+class Manifest:
+    """Conversions recorded in `<output_dir>/.svo_manifest.json`. Safe to use from several threads.
+
+    With `fingerprints`, entries also store a content fingerprint, and a source whose modification time
+    changed is still considered converted when its fingerprint did not. Its entry then takes the new
+    modification time, so the file is not read again on the next run once save() has been called.
+    """
+    def __init__(self, output_dir, fingerprints=False):
+        self.path = os.path.join(output_dir, MANIFEST_FILE)
+        self.fingerprints = fingerprints
+        self.lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            self.entries = {}
+        self.changed = False
+
+    def is_current(self, source, params, output):
+        # True when `source` was converted with `params` into `output`, and neither changed since
+        entry = self.entries.get(os.path.abspath(source))
+        if entry is None or entry['output'] != os.path.abspath(output) or not os.path.isfile(output):
+            return False
+        if entry['params'] != json.loads(json.dumps(params)):
+            return False
+        st = os.stat(source)
+        if entry['size'] != st.st_size:
+            return False
+        if entry['mtime_ns'] == st.st_mtime_ns:
+            return True
+        if not self.fingerprints or entry.get('fingerprint') != fingerprint(source):
+            return False
+        with self.lock:
+            entry['mtime_ns'] = st.st_mtime_ns
+            self.changed = True
+        return True
+
+    def record(self, source, params, output):
+        # Remember a successful conversion and save the manifest
+        st = os.stat(source)
+        entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'params': params,
+                 'output': os.path.abspath(output), 'converted_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        if self.fingerprints:
+            entry['fingerprint'] = fingerprint(source)
+        with self.lock:
+            self.entries[os.path.abspath(source)] = entry
+            self._save()
+
+    def save(self):
+        # Write the modification times refreshed by is_current(), if any
+        with self.lock:
+            if self.changed:
+                self._save()
+
+    def _save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': 1, 'files': self.entries}, f, indent=1)
+        os.replace(tmp, self.path)
+        self.changed = False
@@ -0,0 +1,478 @@
+"""
+Preview helpers of the GUI's trim and AVI players. They do not depend on Tk.
+
+FrameCache keeps preview-sized RGB frames in memory, so scrubbing back and forth over a timeline
+does not decode the same frames again. PreviewDecoder decodes on a background thread and only ever
+works on the most recently requested frame, so dragging a slider never queues up stale decodes.
+Playback plays a video in real time from a ring buffer filled by a read-ahead thread. ThumbnailIndex
+keeps low-resolution thumbnails and the frame timestamps of an SVO on disk, for instant scrubbing.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import cv2
+import numpy as np
+from PIL import Image
+
+try:
+    import pyzed.sl as sl
+except ImportError:
+    sl = None
+
+from svo_manifest import fingerprint
+
+DEFAULT_CACHE_BYTES = 256 * 2**20
+PLAYBACK_BUFFER = 16    # frames decoded ahead of the playback position
+THUMB_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'svo_conv', 'thumbnails')
+THUMB_WIDTH = 128       # width of one side of a thumbnail
+MAX_THUMBS = 1500       # longer recordings get a thumbnail every few frames
+THUMB_QUALITY = 80      # JPEG quality of the cached thumbnails
+THUMB_CACHE_BYTES = 256 * 2**20   # least recently used recordings are dropped from the cache above that
+
+
+def resize_for_preview(rgb, max_width, max_height, fast=False):
+    # Copy of an RGB frame scaled down (never up) to fit a max_width x max_height label. LANCZOS for
+    # still frames; `fast` uses an area filter, several times cheaper on full side-by-side frames, for playback
+    if not fast:
+        img = Image.fromarray(rgb)
+        if max_width > 10 and max_height > 10:
+            img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+        return np.array(img)
+    if max_width <= 10 or max_height <= 10:
+        return rgb.copy()
+    height, width = rgb.shape[:2]
+    scale = min(max_width / width, max_height / height)
+    if scale >= 1:
+        return rgb.copy()
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(rgb, size, interpolation=cv2.INTER_AREA)
+
+
+def scale_to_fit(rgb, max_width, max_height):
+    # RGB frame scaled up or down to fit a max_width x max_height label (thumbnails while scrubbing)
+    if max_width <= 10 or max_height <= 10:
+        return rgb.copy()
+    scale = min(max_width / rgb.shape[1], max_height / rgb.shape[0])
+    size = (max(1, int(rgb.shape[1] * scale)), max(1, int(rgb.shape[0] * scale)))
+    return cv2.resize(rgb, size, interpolation=cv2.INTER_LINEAR)
+
+
+class FrameCache:
+    """Memory-bounded LRU cache of preview frames, keyed by (file, frame, side).
+
+    Each entry remembers the label size it was made for; get() with another size is a miss, so frames
+    are decoded again after the player is resized. Once the frames use more than `max_bytes`, the least
+    recently used ones are dropped. Safe to use from several threads.
+    """
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, frame, side, size):
+        with self.lock:
+            entry = self.entries.get((path, frame, side))
+            if entry is None or entry[0] != size:
+                self.misses += 1
+                return None
+            self.entries.move_to_end((path, frame, side))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, path, frame, side, size, rgb):
+        key = (path, frame, side)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1].nbytes
+            if rgb.nbytes > self.max_bytes:
+                return
+            self.entries[key] = (size, rgb)
+            self.bytes += rgb.nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted.nbytes
+
+    def invalidate(self, path=None, side=None):
+        # Drop the entries of a file and/or a side (all entries without arguments)
+        with self.lock:
+            for key in [k for k in self.entries
+                        if (path is None or k[0] == path) and (side is None or k[2] == side)]:
+                self.bytes -= self.entries.pop(key)[1].nbytes
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PreviewDecoder:
+    """Runs `decode(request)` on a background thread, latest request wins.
+
+    request() replaces a request that has not started yet, so while a slider is dragged the decoder
+    only works on the most recent frame and the stale ones are dropped (counted in `dropped`). The
+    result is passed to `deliver(request, result)` on the decoder thread, None when decoding failed.
+    Hold `busy` to replace what decode() reads from (e.g. the open video) while no decode runs.
+    """
+    def __init__(self, decode, deliver, name='preview-decoder'):
+        self.decode = decode
+        self.deliver = deliver
+        self.cond = threading.Condition()
+        self.busy = threading.Lock()
+        self.pending = None
+        self.closed = False
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def request(self, request):
+        with self.cond:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = request
+            self.cond.notify()
+
+    def cancel(self):
+        # Forget the request that has not started yet
+        with self.cond:
+            self.pending = None
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.pending = None
+            self.cond.notify()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.pending is None and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                request, self.pending = self.pending, None
+            with self.busy:
+                try:
+                    result = self.decode(request)
+                except Exception:
+                    result = None
+            self.deliver(request, result)
+
+
+class SvoSource:
+    """Sequential reader of an open SVO (sl.Camera) for Playback: one preview side as RGB."""
+    def __init__(self, zed, side):
+        self.zed = zed
+        self.view = {'left': sl.VIEW.LEFT, 'right': sl.VIEW.RIGHT}.get(side, sl.VIEW.SIDE_BY_SIDE)
+        self.mat = sl.Mat()
+        # Playback only retrieves images, whatever depth mode the camera was opened with
+        self.rt = sl.RuntimeParameters()
+        self.rt.enable_depth = False
+
+    def seek(self, n):
+        self.zed.set_svo_position(n)
+
+    def grab(self):
+        return self.zed.grab(self.rt) == sl.ERROR_CODE.SUCCESS
+
+    def retrieve(self):
+        self.zed.retrieve_image(self.mat, self.view)
+        return cv2.cvtColor(self.mat.get_data(), cv2.COLOR_BGRA2RGB)
+
+
+class AviSource:
+    """Sequential reader of an open cv2.VideoCapture for Playback: one preview side as RGB."""
+    def __init__(self, cap, side):
+        self.cap = cap
+        self.side = side
+
+    def seek(self, n):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, n)
+
+    def grab(self):
+        return self.cap.grab()
+
+    def retrieve(self):
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return None
+        w = frame.shape[1]
+        if self.side == 'left': frame = frame[:, :w // 2]
+        elif self.side == 'right': frame = frame[:, w // 2:]
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+class Playback:
+    """Real-time playback of frames [start, end) of a source at `fps`.
+
+    A read-ahead thread seeks once, then grabs sequentially and keeps up to `capacity` prepared frames
+    (`prepare(rgb)`, e.g. scaled to the player) in a ring buffer. Frames that are already late when the
+    reader gets to them are grabbed but not retrieved. The player calls next_frame() to get the frame due
+    on the wall clock, skipping late ones, and delay_ms() to schedule its next call. `lock` is held by
+    the reader while it uses the source.
+    """
+    def __init__(self, source, start, end, fps, prepare=None, lock=None, capacity=PLAYBACK_BUFFER):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.interval = 1.0 / (fps or 30)
+        self.prepare = prepare
+        self.lock = lock
+        self.capacity = capacity
+        self.buffer = deque()
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.reader_done = False
+        self.presented = 0
+        self.dropped = 0
+        self.recent = deque(maxlen=32)   # presentation times, for the measured fps
+        self.t0 = time.perf_counter()
+        self.thread = threading.Thread(target=self._read_ahead, name='playback-reader', daemon=True)
+        self.thread.start()
+
+    def due_frame(self):
+        # Frame that should be on screen now
+        return self.start + int((time.perf_counter() - self.t0) / self.interval)
+
+    def _read_ahead(self):
+        if self.lock: self.lock.acquire()
+        try:
+            self.source.seek(self.start)
+            n = self.start
+            while n < self.end and not self.stopped:
+                if not self.source.grab():
+                    break
+                if n < self.due_frame():
+                    # Too late to be shown: skip the retrieve and conversion
+                    with self.cond:
+                        self.dropped += 1
+                    n += 1
+                    continue
+                rgb = self.source.retrieve()
+                if rgb is not None and self.prepare:
+                    rgb = self.prepare(rgb)
+                with self.cond:
+                    while len(self.buffer) >= self.capacity and not self.stopped:
+                        self.cond.wait()
+                    if rgb is not None:
+                        self.buffer.append((n, rgb))
+                n += 1
+        finally:
+            if self.lock: self.lock.release()
+            with self.cond:
+                self.reader_done = True
+
+    def next_frame(self):
+        # The most recent buffered frame that is due, or None. Older due frames are dropped.
+        due = self.due_frame()
+        frame = None
+        with self.cond:
+            while self.buffer and self.buffer[0][0] <= due:
+                if frame is not None:
+                    self.dropped += 1
+                frame = self.buffer.popleft()
+            self.cond.notify()
+        if frame is not None:
+            self.presented += 1
+            self.recent.append(time.perf_counter())
+        return frame
+
+    def delay_ms(self):
+        # Milliseconds until the next frame is due
+        elapsed = time.perf_counter() - self.t0
+        return max(1, int(((int(elapsed / self.interval) + 1) * self.interval - elapsed) * 1000))
+
+    @property
+    def finished(self):
+        with self.cond:
+            return self.reader_done and not self.buffer
+
+    def fps(self):
+        # Presented frames per second, measured over the last presentations
+        if len(self.recent) < 2 or self.recent[-1] == self.recent[0]:
+            return 0.0
+        return (len(self.recent) - 1) / (self.recent[-1] - self.recent[0])
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        self.thread.join()
+
+
+class ThumbnailIndex:
+    """Low-resolution side-by-side thumbnails and per-frame timestamps of an SVO, cached on disk.
+
+    The cache files in `cache_dir` are named after the fingerprint of the SVO (see svo_manifest), so a
+    recording is only indexed once, even when it is moved or copied:
+
+        <fingerprint>.json              frame count, thumbnail step and size
+        <fingerprint>.thumbs.npz        JPEG thumbnails of every `step`-th frame, side by side: the
+                                        encoded bytes one after the other ('jpeg') and their 'offsets'
+        <fingerprint>.timestamps.npy    int64 image timestamp of every frame in nanoseconds
+
+    Thumbnails stay JPEG-encoded in memory too and are decoded when shown. The cache directory is kept
+    under THUMB_CACHE_BYTES by deleting the recordings used least recently.
+
+    build() walks the SVO once with sequential grabs. Thumbnails are available while it runs, as soon
+    as they have been indexed. load() and build() both read the SVO (its fingerprint first), so they
+    belong on a background thread.
+    """
+    def __init__(self, path, cache_dir=THUMB_CACHE_DIR):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.base = None        # cache path without extension, from the fingerprint
+        self.thumbs = None      # JPEG bytes of each thumbnail
+        self.timestamps = None
+        self.step = 1
+        self.count = 0          # thumbnails available
+        self.complete = False
+
+    def _cache_base(self):
+        if self.base is None:
+            self.base = os.path.join(self.cache_dir, fingerprint(self.path))
+        return self.base
+
+    def load(self):
+        # Use the cache of a previous build(); False when there is none
+        base = self._cache_base()
+        try:
+            with open(base + '.json') as f:
+                info = json.load(f)
+            if info.get('version') != 2:
+                return False
+            with np.load(base + '.thumbs.npz') as archive:
+                jpeg, offsets = archive['jpeg'], archive['offsets']
+            timestamps = np.load(base + '.timestamps.npy')
+        except (OSError, ValueError, KeyError):
+            return False
+        # Mark the recording as recently used for the cache eviction
+        os.utime(base + '.json')
+        self.thumbs = [jpeg[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+        self.timestamps, self.step = timestamps, info['step']
+        self.count = len(self.thumbs)
+        self.complete = True
+        return True
+
+    def build(self, stop=None, progress=None):
+        # Index the SVO and save the cache; returns False when stopped or when the SVO cannot be read. A
+        # recording that cannot be read to the end is indexed up to the last frame grabbed.
+        base = self._cache_base()
+        zed = sl.Camera()
+        ip = sl.InitParameters()
+        ip.set_from_svo_file(self.path)
+        ip.svo_real_time_mode = False
+        ip.depth_mode = sl.DEPTH_MODE.NONE
+        if zed.open(ip) != sl.ERROR_CODE.SUCCESS:
+            return False
+        try:
+            frames = zed.get_svo_number_of_frames()
+            res = zed.get_camera_information().camera_configuration.resolution
+            width = THUMB_WIDTH
+            height = max(2, int(round(THUMB_WIDTH * res.height / res.width)))
+            step = max(1, math.ceil(frames / MAX_THUMBS))
+            thumbs = []
+            timestamps = np.zeros(frames, dtype=np.int64)
+            self.thumbs, self.timestamps, self.step = thumbs, timestamps, step
+            sbs = np.empty((height, width * 2, 3), dtype=np.uint8)
+
+            # Only thumbnails are retrieved (at their size), the other frames are just grabbed
+            rt = sl.RuntimeParameters()
+            rt.enable_depth = False
+            left, right = sl.Mat(), sl.Mat()
+            thumb_res = sl.Resolution(width, height)
+            grabbed = 0
+            for n in range(frames):
+                if stop is not None and stop.is_set():
+                    return False
+                if zed.grab(rt) != sl.ERROR_CODE.SUCCESS:
+                    break
+                grabbed = n + 1
+                timestamps[n] = zed.get_timestamp(sl.TIME_REFERENCE.IMAGE).get_nanoseconds()
+                if n % step == 0:
+                    zed.retrieve_image(left, sl.VIEW.LEFT, sl.MEM.CPU, thumb_res)
+                    zed.retrieve_image(right, sl.VIEW.RIGHT, sl.MEM.CPU, thumb_res)
+                    cv2.cvtColor(left.get_data(), cv2.COLOR_BGRA2BGR, dst=sbs[:, :width])
+                    cv2.cvtColor(right.get_data(), cv2.COLOR_BGRA2BGR, dst=sbs[:, width:])
+                    thumbs.append(cv2.imencode('.jpg', sbs, [cv2.IMWRITE_JPEG_QUALITY, THUMB_QUALITY])[1])
+                    self.count = len(thumbs)
+                if progress and n % 100 == 0:
+                    progress(n / frames * 100)
+        finally:
+            zed.close()
+        if not grabbed:
+            return False
+
+        # Only the frames actually read are saved, so that load() never shows missing thumbnails
+        timestamps = timestamps[:grabbed]
+        self.timestamps = timestamps
+        offsets = np.cumsum([0] + [len(jpeg) for jpeg in thumbs], dtype=np.int64)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        with open(base + '.thumbs.npz.tmp', 'wb') as f:
+            np.savez(f, jpeg=np.concatenate(thumbs).ravel(), offsets=offsets)
+        os.replace(base + '.thumbs.npz.tmp', base + '.thumbs.npz')
+        with open(base + '.timestamps.npy.tmp', 'wb') as f:
+            np.save(f, timestamps)
+        os.replace(base + '.timestamps.npy.tmp', base + '.timestamps.npy')
+        with open(base + '.json.tmp', 'w') as f:
+            json.dump({'version': 2, 'frames': grabbed, 'thumbs': len(thumbs), 'step': step, 'width': width,
+                       'height': height}, f)
+        os.replace(base + '.json.tmp', base + '.json')
+        self.complete = True
+        prune_thumbnail_cache(self.cache_dir, THUMB_CACHE_BYTES, keep=os.path.basename(base))
+        return True
+
+    def thumbnail(self, n, side):
+        # Thumbnail of the indexed frame closest before frame n for a preview side, None if not indexed yet
+        k = n // self.step
+        if self.thumbs is None or k >= self.count:
+            return None
+        thumb = cv2.imdecode(self.thumbs[k], cv2.IMREAD_COLOR)
+        w = thumb.shape[1] // 2
+        if side == 'left': thumb = thumb[:, :w]
+        elif side == 'right': thumb = thumb[:, w:]
+        return cv2.cvtColor(thumb, cv2.COLOR_BGR2RGB)
+
+    def seconds(self, n):
+        # Time of frame n since the first frame, from the recorded timestamps (None if not indexed yet)
+        if not self.complete or not 0 <= n < len(self.timestamps) or not self.timestamps[n]:
+            return None
+        return (int(self.timestamps[n]) - int(self.timestamps[0])) / 1e9
+
+
+def prune_thumbnail_cache(cache_dir=THUMB_CACHE_DIR, max_bytes=THUMB_CACHE_BYTES, keep=None):
+    # Delete the cache files of the least recently used recordings (by the latest modification time of
+    # their files, which load() refreshes) until `cache_dir` holds at most max_bytes; `keep` is the
+    # fingerprint of a recording that must stay. Files of older cache versions are dropped this way too.
+    recordings = {}
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        try:
+            st = os.stat(os.path.join(cache_dir, name))
+        except OSError:
+            continue
+        size, used = recordings.get(name.split('.')[0], (0, 0))
+        recordings[name.split('.')[0]] = (size + st.st_size, max(used, st.st_mtime))
+    total = sum(size for size, _ in recordings.values())
+    for key, (size, _) in sorted(recordings.items(), key=lambda item: item[1][1]):
+        if total <= max_bytes:
+            break
+        if key == keep:
+            continue
+        for name in names:
+            if name.split('.')[0] == key:
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+        total -= size
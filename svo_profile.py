@@ -0,0 +1,178 @@
+"""
+Opt-in timing instrumentation for the export loops (svo_export.py --profile and the GUI exports).
+
+StageProfiler collects a latency histogram per stage (grab, retrieve, compose, encode, imwrite, ...),
+the frame rate over time and the peak resident memory of the process. summary() returns all of it as
+a dict that can be written as JSON, format_summary() renders it as a table. NULL_PROFILER has the same
+interface and records nothing, so the loops can be instrumented unconditionally.
+"""
+
+import contextlib
+import math
+import os
+import sys
+import threading
+import time
+
+BUCKETS_PER_DECADE = 20
+MIN_SECONDS = 1e-6
+
+
+class _Stage:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        k = int(math.log10(max(seconds, MIN_SECONDS) / MIN_SECONDS) * BUCKETS_PER_DECADE)
+        self.buckets[k] = self.buckets.get(k, 0) + 1
+
+    def percentile(self, q):
+        # Upper edge of the bucket holding the q-th percentile (about 12% resolution), capped at max
+        rank = q / 100 * self.count
+        seen = 0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if seen >= rank:
+                return min(MIN_SECONDS * 10 ** ((k + 1) / BUCKETS_PER_DECADE), self.max)
+        return self.max
+
+
+class _Timer:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class StageProfiler:
+    """Thread-safe per-stage latency histograms, fps timeline and peak RSS of one export run."""
+    enabled = True
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.frames = 0
+        self.start_time = self.sample_time = time.perf_counter()
+        self.sample_frames = 0
+        self.timeline = []
+
+    def time(self, name):
+        # Context manager adding the duration of its block to stage `name`
+        return _Timer(self, name)
+
+    def add(self, name, seconds):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = _Stage()
+            stage.add(seconds)
+
+    def merge(self, stages):
+        # Add the `stages` of another profiler, e.g. one that ran in a worker process
+        with self.lock:
+            for name, other in stages.items():
+                stage = self.stages.get(name)
+                if stage is None:
+                    stage = self.stages[name] = _Stage()
+                stage.count += other.count
+                stage.total += other.total
+                stage.max = max(stage.max, other.max)
+                for k, n in other.buckets.items():
+                    stage.buckets[k] = stage.buckets.get(k, 0) + n
+
+    def frame(self, count=1):
+        # Count exported frames; the frame rate is sampled every `interval` seconds
+        with self.lock:
+            self.frames += count
+            now = time.perf_counter()
+            if now - self.sample_time >= self.interval:
+                self.timeline.append((round(now - self.start_time, 2),
+                                      round((self.frames - self.sample_frames) / (now - self.sample_time), 2)))
+                self.sample_time, self.sample_frames = now, self.frames
+
+    def summary(self):
+        with self.lock:
+            elapsed = time.perf_counter() - self.start_time
+            stages = {name: {'count': s.count, 'total_s': round(s.total, 4),
+                             'mean_ms': round(s.total / s.count * 1e3, 3),
+                             'p50_ms': round(s.percentile(50) * 1e3, 3), 'p95_ms': round(s.percentile(95) * 1e3, 3),
+                             'max_ms': round(s.max * 1e3, 3)}
+                      for name, s in self.stages.items()}
+            return {'elapsed_s': round(elapsed, 3), 'frames': self.frames,
+                    'fps': round(self.frames / elapsed, 2) if elapsed > 0 else 0.0,
+                    'fps_timeline': list(self.timeline), 'peak_rss_bytes': peak_rss_bytes(), 'stages': stages}
+
+
+class _NullProfiler:
+    enabled = False
+
+    def time(self, name):
+        return contextlib.nullcontext()
+
+    def add(self, name, seconds):
+        pass
+
+    def merge(self, stages):
+        pass
+
+    def frame(self, count=1):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def peak_rss_bytes():
+    # Peak resident set size of this process, None where it cannot be read
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+def format_summary(summary):
+    # Human-readable table of a summary() dict, slowest stages (by total time) first
+    lines = [f"Profile: {summary['frames']} frames in {summary['elapsed_s']:.2f} s ({summary['fps']:.1f} fps)"]
+    if summary.get('peak_rss_bytes'):
+        lines[0] += f", peak RSS {summary['peak_rss_bytes'] / 2**20:.0f} MiB"
+    lines.append(f"{'stage':<12} {'count':>8} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, s in sorted(summary['stages'].items(), key=lambda item: -item[1]['total_s']):
+        lines.append(f"{name:<12} {s['count']:>8} {s['total_s']:>9.3f} {s['mean_ms']:>9.3f} {s['p50_ms']:>9.3f} "
+                     f"{s['p95_ms']:>9.3f} {s['max_ms']:>9.3f}")
+    timeline = summary.get('fps_timeline') or []
+    if timeline:
+        step = max(1, len(timeline) // 10)
+        lines.append("fps over time: " + "  ".join(f"{t:.0f}s:{fps:.1f}" for t, fps in timeline[::step]))
+    return "\n".join(lines)
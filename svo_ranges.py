@@ -0,0 +1,116 @@
+"""
+Frame ranges for multi-range exports (svo_export.py --ranges and the ranges list of the GUI's trim tab).
+
+Ranges are given as text, "100-250, landing:900-1200" (optionally named), or as a CSV file of events
+with one range per row:
+
+    start_frame,end_frame,name
+    100,250,takeoff
+    900,1200,landing
+
+The header and the name column are optional; empty lines and lines starting with # are ignored.
+Range names must be unique, as they name the outputs.
+visit_plan() merges the ranges into the ascending list of frames to decode, so that a recording is read
+once, front to back, whatever the order and overlap of the ranges.
+"""
+
+import csv
+import os
+import re
+
+
+class FrameRange:
+    """Frames [start, end) of a recording, exported under `name` (by default "<start>_<end>")."""
+    def __init__(self, start, end, name=''):
+        self.start = start
+        self.end = end
+        self.name = name or f"{start}_{end}"
+
+    def frames(self, stride=1):
+        return range(self.start, self.end, stride)
+
+    def __repr__(self):
+        return f"FrameRange({self.start}, {self.end}, {self.name!r})"
+
+
+def parse_ranges(text):
+    # "100-250, landing:900-1200" -> [FrameRange(100, 250), FrameRange(900, 1200, 'landing')]; raises ValueError
+    ranges = []
+    for part in re.split(r'[,;\s]+', text.strip()):
+        if not part:
+            continue
+        m = re.fullmatch(r'(?:([\w.-]+):)?(\d+)-(\d+)', part)
+        if not m:
+            raise ValueError(f"Invalid frame range '{part}', expected [NAME:]START-END")
+        ranges.append(_checked(int(m.group(2)), int(m.group(3)), m.group(1) or ''))
+    return check_range_names(ranges)
+
+
+def format_ranges(ranges):
+    # Inverse of parse_ranges(), e.g. to pass the ranges of the GUI to svo_export.py --ranges
+    return ",".join(f"{r.name}:{r.start}-{r.end}" for r in ranges)
+
+
+def load_ranges(path):
+    # Ranges of a CSV file with start_frame,end_frame[,name] rows; raises ValueError on a malformed row
+    ranges = []
+    with open(path, newline='') as f:
+        for k, row in enumerate(csv.reader(f)):
+            row = [cell.strip() for cell in row]
+            if not row or not row[0] or row[0].startswith('#'):
+                continue
+            if k == 0 and not row[0].isdigit():
+                continue   # header
+            if len(row) < 2 or not row[0].isdigit() or not row[1].isdigit():
+                raise ValueError(f"{os.path.basename(path)}, line {k + 1}: expected start_frame,end_frame[,name]")
+            ranges.append(_checked(int(row[0]), int(row[1]), row[2] if len(row) > 2 else ''))
+    return check_range_names(ranges)
+
+
+def ranges_from_option(value):
+    # --ranges value: the path of a CSV file, or ranges as text
+    return load_ranges(value) if os.path.isfile(value) else parse_ranges(value)
+
+
+def check_range_names(ranges):
+    # Every range is written to an output named after it: raises ValueError when two ranges would share
+    # one (names are compared case-insensitively, as on Windows file systems)
+    seen = set()
+    for r in ranges:
+        if r.name.lower() in seen:
+            raise ValueError(f"Two frame ranges are named '{r.name}', every range needs its own name")
+        seen.add(r.name.lower())
+    return ranges
+
+
+def _checked(start, end, name):
+    if end <= start:
+        raise ValueError(f"Invalid frame range {start}-{end}: the end must be greater than the start")
+    # Names become file and folder names: "." and ".." would write outside the output folder
+    if name and not name.strip('.'):
+        raise ValueError(f"Invalid frame range name '{name}': it needs at least one character other than '.'")
+    return FrameRange(start, end, re.sub(r'[^\w.-]+', '_', name))
+
+
+def visit_plan(frame_lists):
+    """Frames to decode for several frame lists, in ascending order, each with the lists that contain it.
+
+    Returns [(frame, [indexes into frame_lists]), ...]. A frame shared by overlapping lists appears once.
+    """
+    owners = {}
+    for k, frames in enumerate(frame_lists):
+        for n in frames:
+            owners.setdefault(n, []).append(k)
+    return sorted(owners.items())
+
+
+def count_seeks(positions, max_gap=0):
+    # Repositionings needed to visit ascending `positions`: one for the first frame and one per gap
+    # larger than `max_gap` (smaller gaps are grabbed through)
+    seeks = 0
+    expected = None
+    for n in positions:
+        if expected is None or not 0 <= n - expected <= max_gap:
+            seeks += 1
+        expected = n + 1
+    return seeks